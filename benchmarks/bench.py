@@ -0,0 +1,294 @@
+"""
+Benchmarks for the bridge hot paths: decode, directory listing and sync.
+
+Runs outside ComfyUI: `folder_paths` is replaced by a stand-in pointing at a
+scratch input folder, and synthetic exports are generated on first use.
+
+    python benchmarks/bench.py                          # quick set, prints JSON
+    python benchmarks/bench.py --sizes 1k,4k,8k,12k --out results.json
+    python benchmarks/bench.py --baseline results.json  # compare against a stored run
+"""
+
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import argparse
+import platform
+import tempfile
+import importlib
+import tracemalloc
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+import numpy as np
+from PIL import Image
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ["RGB", "RGBA", "L", "P", "I", "I16"]
+
+
+# ── Environment ──────────────────────────────────────────────────────────────
+def install_folder_paths(work_dir):
+    module = types.ModuleType("folder_paths")
+    module.get_input_directory = lambda: os.path.join(work_dir, "input")
+    module.get_output_directory = lambda: os.path.join(work_dir, "output")
+    module.get_temp_directory = lambda: os.path.join(work_dir, "temp")
+    sys.modules["folder_paths"] = module
+
+
+def import_bridge():
+    """Import the repo as a package so the nodes' relative imports resolve."""
+    package = types.ModuleType("photoshop_bridge")
+    package.__path__ = [REPO_DIR]
+    sys.modules["photoshop_bridge"] = package
+    nodes = importlib.import_module("photoshop_bridge.comfyui_nodes.nodes")
+    sync = importlib.import_module("photoshop_bridge.bridge_sync")
+    return nodes, sync
+
+
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    return int(float(text[:-1]) * 1024) if text.endswith("k") else int(text)
+
+
+# ── Synthetic exports ────────────────────────────────────────────────────────
+def synthetic_image(size, mode, seed=0):
+    """Smooth gradients with noisy blocks: compresses like real artwork, not like noise."""
+    rng = np.random.default_rng(seed)
+    height, width = size * 3 // 4, size
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    base = (y * 0.6 + x * 0.4)
+    noise = rng.integers(0, 24, (height // 64 + 1, width // 64 + 1), dtype=np.uint8)
+    base = base + np.kron(noise, np.ones((64, 64), np.uint8))[:height, :width]
+    gray = np.clip(base, 0, 255).astype(np.uint8)
+    rgb = np.stack([gray, np.flipud(gray), np.fliplr(gray)], axis=-1)
+
+    if mode == "RGB":
+        return Image.fromarray(rgb, "RGB")
+    if mode == "RGBA":
+        alpha = np.where(gray > 64, 255, gray * 4).astype(np.uint8)
+        return Image.fromarray(np.dstack([rgb, alpha]), "RGBA")
+    if mode == "L":
+        return Image.fromarray(gray, "L")
+    if mode == "P":
+        img = Image.fromarray(rgb, "RGB").quantize(64)
+        img.info["transparency"] = 0
+        return img
+    if mode == "I":
+        return Image.fromarray(gray.astype(np.int32) * 257, "I")
+    if mode == "I16":
+        return Image.fromarray(gray.astype(np.uint16) * 257)
+    raise ValueError(mode)
+
+
+def ensure_export(cache_dir, size, mode):
+    # Pillow is dropping 32-bit "I" PNGs; the loader opens any file by name, so use TIFF
+    ext = ".tif" if mode == "I" else ".png"
+    path = os.path.join(cache_dir, f"synthetic_{size}_{mode}{ext}")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        img = synthetic_image(size, mode)
+        if mode == "I":
+            img.save(path, format="TIFF")
+        else:
+            kwargs = {"transparency": 0} if mode == "P" else {}
+            img.save(path, format="PNG", compress_level=6, **kwargs)
+    return path
+
+
+# ── Measurements ─────────────────────────────────────────────────────────────
+def measure(fn, repeat=1):
+    """Best wall time of `repeat` runs and the tracemalloc peak of the first."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    fn()
+    best = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best, peak / (1024 * 1024)
+
+
+def bench_decode(nodes, work_dir, sizes, modes, repeat):
+    bridge = nodes.LoadFromPhotoshop.bridge_dir()
+    cache_dir = os.path.join(work_dir, "exports_cache")
+    os.makedirs(bridge, exist_ok=True)
+    loader = nodes.LoadFromPhotoshop()
+    results = []
+    for size in sizes:
+        for mode in modes:
+            source = ensure_export(cache_dir, size, mode)
+            name = os.path.basename(source)
+            shutil.copy(source, os.path.join(bridge, name))
+            with Image.open(source) as img:
+                megapixels = img.width * img.height / 1e6
+
+            def cold():
+                nodes.TENSOR_CACHE.clear()
+                loader.load_image(name)
+
+            cold_s, peak_mb = measure(cold, repeat)
+            warm_s, _ = measure(lambda: loader.load_image(name), repeat)
+            results.append({
+                "bench": "decode", "key": f"decode/{size}/{mode}",
+                "size": size, "mode": mode, "file_mb": os.path.getsize(source) / 1e6,
+                "wall_s": cold_s, "warm_s": warm_s,
+                "mp_per_s": megapixels / cold_s if cold_s else None,
+                "peak_tracemalloc_mb": peak_mb, "max_rss_mb": max_rss_mb(),
+            })
+            nodes.TENSOR_CACHE.clear()
+            os.remove(os.path.join(bridge, name))
+            print(f"decode {size} {mode}: {cold_s * 1000:.1f} ms cold, "
+                  f"{warm_s * 1000:.3f} ms warm, peak {peak_mb:.0f} MB", file=sys.stderr)
+    return results
+
+
+def bench_listing(nodes, work_dir, counts, repeat):
+    from photoshop_bridge.comfyui_nodes.dirindex import DirectoryIndex
+    results = []
+    for count in counts:
+        folder = os.path.join(work_dir, f"listing_{count}")
+        os.makedirs(folder, exist_ok=True)
+        for i in range(count):
+            path = os.path.join(folder, f"export_{i:05d}.png")
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.write(b"\x89PNG")
+        extensions = nodes.IMAGE_EXTENSIONS
+
+        def naive():
+            files = [f for f in os.listdir(folder) if f.lower().endswith(extensions)]
+            files.sort(key=lambda x: os.path.getmtime(os.path.join(folder, x)), reverse=True)
+
+        naive_s, _ = measure(naive, repeat)
+        cold_s, peak_mb = measure(lambda: DirectoryIndex(folder, extensions).names(), repeat)
+        index = DirectoryIndex(folder, extensions, ttl=0)
+        index.names()
+        warm_s, _ = measure(index.names, repeat)
+        results.append({
+            "bench": "listing", "key": f"listing/{count}", "files": count,
+            "wall_s": cold_s, "warm_s": warm_s, "naive_s": naive_s,
+            "files_per_s": count / cold_s if cold_s else None,
+            "peak_tracemalloc_mb": peak_mb, "max_rss_mb": max_rss_mb(),
+        })
+        print(f"listing {count}: {cold_s * 1000:.2f} ms cold, {warm_s * 1000:.2f} ms warm, "
+              f"{naive_s * 1000:.2f} ms listdir+getmtime", file=sys.stderr)
+    return results
+
+
+def bench_sync(sync, work_dir, counts, size):
+    results = []
+    source = ensure_export(os.path.join(work_dir, "exports_cache"), size, "RGBA")
+    for count in counts:
+        exports = os.path.join(work_dir, f"sync_{count}", "exports")
+        target = os.path.join(work_dir, f"sync_{count}", "pod")
+        shutil.rmtree(os.path.dirname(exports), ignore_errors=True)
+        os.makedirs(exports)
+        for i in range(count):
+            shutil.copy(source, os.path.join(exports, f"export_{i:04d}.png"))
+        total_mb = count * os.path.getsize(source) / 1e6
+
+        agent = sync.SyncAgent(exports, sync.LocalDirTransport(target), debounce=0,
+                               state_path=os.path.join(os.path.dirname(exports), "state.json"))
+        first_s, peak_mb = measure(agent.poll)
+        idle_s, _ = measure(agent.poll)
+        results.append({
+            "bench": "sync", "key": f"sync/{count}", "files": count, "total_mb": total_mb,
+            "wall_s": first_s, "idle_poll_s": idle_s,
+            "mb_per_s": total_mb / first_s if first_s else None,
+            "peak_tracemalloc_mb": peak_mb, "max_rss_mb": max_rss_mb(),
+        })
+        print(f"sync {count} x {size}px: {first_s * 1000:.1f} ms, idle poll {idle_s * 1000:.2f} ms",
+              file=sys.stderr)
+    return results
+
+
+# ── Baseline comparison ──────────────────────────────────────────────────────
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {r["key"]: r for r in json.load(f)["results"]}
+    regressions = 0
+    for result in results:
+        old = baseline.get(result["key"])
+        if not old or not old.get("wall_s"):
+            continue
+        ratio = result["wall_s"] / old["wall_s"]
+        flag = "REGRESSION" if ratio > 1 + threshold else ""
+        regressions += bool(flag)
+        print(f"{result['key']:<24} {old['wall_s'] * 1000:10.2f} ms -> "
+              f"{result['wall_s'] * 1000:10.2f} ms  x{ratio:.2f} {flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,2k,4k", help="decode sizes, e.g. 1k,4k,8k,12k")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--listing", default="100,1000,10000", help="file counts for listing")
+    parser.add_argument("--sync", default="1,8,32", help="changed-file counts for sync")
+    parser.add_argument("--sync-size", default="2k")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", choices=["decode", "listing", "sync"], action="append")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "ps_bridge_bench"))
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare wall times against a previous results JSON")
+    parser.add_argument("--threshold", type=float, default=0.15, help="regression tolerance")
+    args = parser.parse_args()
+
+    os.makedirs(args.work_dir, exist_ok=True)
+    install_folder_paths(args.work_dir)
+    nodes, sync = import_bridge()
+    wanted = set(args.only or ["decode", "listing", "sync"])
+
+    results = []
+    if "decode" in wanted:
+        results += bench_decode(nodes, args.work_dir, [parse_size(s) for s in args.sizes.split(",")],
+                                args.modes.split(","), args.repeat)
+    if "listing" in wanted:
+        results += bench_listing(nodes, args.work_dir, [int(c) for c in args.listing.split(",")],
+                                 args.repeat)
+    if "sync" in wanted:
+        results += bench_sync(sync, args.work_dir, [int(c) for c in args.sync.split(",")],
+                              parse_size(args.sync_size))
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pillow": Image.__version__,
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        sys.exit(1 if compare(results, args.baseline, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
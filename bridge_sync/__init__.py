@@ -0,0 +1,12 @@
+"""
+Mac-side sync agent for the ComfyUI Photoshop Bridge.
+
+Run with: python3 -m bridge_sync --help
+"""
+
+from .agent import SyncAgent
+from .fanout import FanOutSync, load_targets
+from .transports import HTTPTransport, LocalDirTransport, ParallelTransport, SSHTransport, Transport
+
+__all__ = ['SyncAgent', 'FanOutSync', 'load_targets', 'Transport', 'LocalDirTransport',
+           'SSHTransport', 'HTTPTransport', 'ParallelTransport']
@@ -0,0 +1,75 @@
+import os
+import argparse
+
+from .agent import SyncAgent
+from .fanout import FanOutSync, load_targets
+from .transports import HTTPTransport, LocalDirTransport, SSHTransport
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_transport(args):
+    if args.ssh:
+        return SSHTransport(args.ssh, port=args.port, key=args.key)
+    if args.http:
+        return HTTPTransport(args.http)
+    return LocalDirTransport(args.dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bridge_sync",
+                                     description="Sync Photoshop exports to a ComfyUI pod.")
+    parser.add_argument("--exports", default=os.path.join(REPO_DIR, "exports"))
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--ssh", metavar="HOST", help="pod IP/host (rsync over SSH)")
+    target.add_argument("--http", metavar="URL", help="ComfyUI base URL (upload route)")
+    target.add_argument("--dir", metavar="PATH", help="local directory (testing)")
+    target.add_argument("--targets", metavar="INI", help="push to every pod listed in this file, in parallel")
+    parser.add_argument("--port", type=int, default=22)
+    parser.add_argument("--key", default="~/.ssh/id_ed25519")
+    parser.add_argument("--debounce", type=float, default=0.5)
+    parser.add_argument("--max-age-days", type=float, default=30,
+                        help="delete sent exports unused for this long (0 = keep)")
+    parser.add_argument("--quota-gb", type=float, default=0,
+                        help="keep exports/ under this size, oldest first (0 = no limit)")
+    parser.add_argument("--pull", metavar="DIR", nargs="?", const=os.path.join(REPO_DIR, "imports"),
+                        help="also fetch Save Image to Photoshop results (default: imports/)")
+    parser.add_argument("--raw", action="store_true",
+                        help="send PNG exports as .psraw raw pixels (no decode on the pod)")
+    parser.add_argument("--raw-compress", action="store_true",
+                        help="LZ-compress .psraw files (lz4 if installed, else zlib level 1)")
+    parser.add_argument("--store", action="store_true",
+                        help="send into the pod's content-addressed store (versioned, deduplicated)")
+    parser.add_argument("--trace", action="store_true",
+                        help="forward the plugin's latency traces with stage timestamps (see tracing.py)")
+    parser.add_argument("--once", action="store_true", help="send pending changes and exit")
+    args = parser.parse_args()
+
+    if args.targets:
+        fanout = FanOutSync(args.exports, load_targets(args.targets), pull_dir=args.pull,
+                            debounce=args.debounce, max_age_days=args.max_age_days,
+                            quota_bytes=int(args.quota_gb * 1024 ** 3), store=args.store,
+                            trace=args.trace, raw=args.raw or args.raw_compress,
+                            raw_compress=args.raw_compress)
+        if args.once:
+            for name, status in fanout.once().items():
+                print(f"{name}: {status['state']}, {status['pending']} pending")
+        else:
+            fanout.run()
+        return
+
+    agent = SyncAgent(args.exports, build_transport(args), debounce=args.debounce,
+                      max_age_days=args.max_age_days,
+                      quota_bytes=int(args.quota_gb * 1024 ** 3), pull_dir=args.pull,
+                      raw=args.raw or args.raw_compress, raw_compress=args.raw_compress,
+                      store=args.store, trace=args.trace)
+    if args.once:
+        agent.debounce = 0
+        agent.step()
+        agent.transport.close()
+    else:
+        agent.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Resident sync agent: watches exports/, debounces bursts of writes and sends
+each changed file once over a persistent transport.
+"""
+
+import os
+import json
+import time
+import shutil
+
+from .hashing import hash_file
+from .retention import RetentionIndex, delete_files
+from .store import MANIFEST, STORE_DIR, Manifest
+from . import tracing
+
+try:
+    from .delta import TileDeltaEncoder
+    from . import layered, rawpix
+except ImportError:     # numpy / Pillow not installed on this machine
+    TileDeltaEncoder = layered = rawpix = None
+
+# .json: region sidecars written next to selection exports
+# .tif: layered exports, packed from the plugin's hidden .<name>.layers folders
+EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.json', '.tif', '.tiff')
+
+
+def log(message):
+    print(f"{time.strftime('%Y-%m-%d %H:%M:%S')} [bridge_sync] {message}", flush=True)
+
+
+class SyncAgent:
+    """Polls a folder and pushes files whose content changed since the last send.
+
+    A file is sent once it has been quiet for `debounce` seconds, so a burst of
+    exports becomes one batch. Content hashes are cached per (mtime_ns, size)
+    and the last sent hash per file is kept in `state_path`, so restarts and
+    touch-only rewrites do not resend anything. Failed batches are retried
+    with exponential backoff. Old exports are removed by age and, optionally,
+    by a byte quota (least recently sent first); unsent files are never removed.
+
+    When the transport supports it (`supports_deltas`) and numpy/Pillow are
+    available, a PNG that was sent before is shipped as a tile delta against
+    the acknowledged version, falling back to the full file if the receiver
+    lacks that base or most tiles changed.
+
+    With `raw=True`, PNG exports are converted to the .psraw raw-pixel format
+    (optionally LZ-compressed) just before sending, so the pod maps the
+    pixels instead of inflating them; deltas are not used then.
+
+    With `store=True`, exports go into the pod's content-addressed store
+    instead (see store.py): each distinct content is uploaded once as
+    store/<hash><ext>, then the manifest naming it as the new version.
+
+    `hash_cache` lets several agents over the same folder share content
+    hashes, and `protect` returns extra names that prune() must keep (files
+    another agent has not delivered yet).
+    """
+
+    def __init__(self, exports_dir, transport, state_path=None, debounce=0.5,
+                 poll_interval=0.5, max_backoff=60.0, max_age_days=30, quota_bytes=0,
+                 pull_dir=None, pull_interval=5.0, deltas=True, raw=False, raw_compress=False,
+                 store=False, trace=False, hash_cache=None, protect=None):
+        self.exports_dir = exports_dir
+        self.transport = transport
+        self.state_path = state_path or os.path.join(
+            os.path.dirname(os.path.abspath(exports_dir)), ".sync_state.json")
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.pull_dir = pull_dir if transport.can_pull else None
+        if pull_dir and not transport.can_pull:
+            log(f"{transport.name}: cannot pull results, --pull ignored")
+        self.pull_interval = pull_interval
+        self._last_pull = 0.0
+        if raw and rawpix is None:
+            raise RuntimeError("--raw needs numpy and Pillow")
+        self.raw = raw
+        self.raw_compress = raw_compress
+        self.trace = trace
+        self.manifest = None
+        if store:
+            root, ext = os.path.splitext(self.state_path)
+            self.manifest_path = root + ".manifest" + ext
+            self.manifest = Manifest.load(self.manifest_path)
+        self.deltas = None
+        if deltas and not raw and not store and TileDeltaEncoder is not None and transport.supports_deltas:
+            self.deltas = TileDeltaEncoder()
+        self.retention = RetentionIndex(
+            max_age_days, quota_bytes,
+            os.path.join(os.path.dirname(self.state_path), ".sync_retention.json"))
+        self._seen = {}         # name -> (mtime_ns, size)
+        self._hashes = {} if hash_cache is None else hash_cache   # name -> ((mtime_ns, size), digest)
+        self._pending = {}      # name -> deadline
+        self._changed_at = {}   # name -> wall time a not-yet-delivered change was noticed
+        self._failures = 0
+        self._retry_at = 0.0
+        self.protect = protect
+        self.scanned = False
+        self.last_sent = None
+        self.last_error = None
+        self.sent = self._load_state()
+
+    # ── State ────────────────────────────────────────────────────────────────
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f).get("sent", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"sent": self.sent}, f)
+        os.replace(tmp, self.state_path)
+
+    # ── Scanning ─────────────────────────────────────────────────────────────
+    def scan(self):
+        found = {}
+        stacks = []
+        try:
+            with os.scandir(self.exports_dir) as it:
+                for de in it:
+                    name = de.name
+                    if layered is not None and layered.is_stack(name):
+                        stacks.append(de.path)
+                    if name.startswith(".") or not name.lower().endswith(EXTENSIONS):
+                        continue
+                    if name.endswith(tracing.SUFFIX):
+                        continue    # forwarded with their export, see _send_traces
+                    try:
+                        st = de.stat()
+                    except OSError:
+                        continue
+                    found[name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        for stack in stacks:
+            try:
+                path = layered.pack_stale(stack)
+            except ValueError as e:
+                log(str(e))
+                continue
+            if path is not None:
+                st = os.stat(path)
+                found[os.path.basename(path)] = (st.st_mtime_ns, st.st_size)
+                log(f"packed {os.path.basename(path)}")
+        return found
+
+    def fingerprint(self, name, signature):
+        cached = self._hashes.get(name)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        digest = hash_file(os.path.join(self.exports_dir, name))
+        self._hashes[name] = (signature, digest)
+        return digest
+
+    # ── Main loop ────────────────────────────────────────────────────────────
+    def poll(self):
+        """One iteration: note changes, then send whatever has settled."""
+        now = time.monotonic()
+        found = self.scan()
+        for name, signature in found.items():
+            if self._seen.get(name) != signature:
+                self._pending[name] = now + self.debounce
+                self._changed_at.setdefault(name, time.time())
+                self.retention.update(name, signature[1], signature[0] / 1e9)
+        known = self._seen.keys() if self._seen else self.retention.names()
+        for name in known - found.keys():
+            self.retention.remove(name)
+            self._changed_at.pop(name, None)
+        self._seen = found
+        self.scanned = True
+
+        if now < self._retry_at:
+            return 0
+        ready = [n for n, deadline in self._pending.items() if deadline <= now]
+        batch = {}
+        for name in ready:
+            del self._pending[name]
+            if name not in found:
+                continue
+            try:
+                digest = self.fingerprint(name, found[name])
+            except OSError:
+                continue
+            if self.sent.get(name) != digest:
+                batch[name] = digest
+            else:
+                self._changed_at.pop(name, None)
+        if not batch:
+            return 0
+        return self.send(batch)
+
+    def _send_deltas(self, batch):
+        """Try deltas first; returns (names delivered, encoder states)."""
+        done, states = set(), {}
+        if self.deltas is None:
+            return done, states
+        for name, digest in batch.items():
+            if not name.lower().endswith(".png"):
+                continue
+            try:
+                payload, states[name] = self.deltas.prepare(
+                    name, os.path.join(self.exports_dir, name), digest)
+                if payload is not None and self.transport.send_delta(name, payload):
+                    done.add(name)
+            except Exception as e:
+                log(f"{self.transport.name}: delta for {name} failed ({e}); sending full file")
+        return done, states
+
+    def _staging(self):
+        """Dot-folder in exports/ (same volume, so objects can be hard links), one per agent."""
+        state = os.path.splitext(os.path.basename(self.state_path))[0].lstrip(".")
+        path = os.path.join(self.exports_dir, f".staging.{state}")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def _outgoing(self, name, staged):
+        """Path to send for an export, converting PNGs to .psraw in raw mode."""
+        path = os.path.join(self.exports_dir, name)
+        if not self.raw or not name.lower().endswith(".png"):
+            return path
+        raw_path = os.path.join(self._staging(), os.path.splitext(name)[0] + rawpix.SUFFIX)
+        rawpix.convert_file(path, raw_path, self.raw_compress)
+        staged.append(raw_path)
+        return raw_path
+
+    def _send_store(self, names, batch, staged):
+        """Upload objects the pod does not hold yet, then the manifest naming them."""
+        manifest = self.manifest.copy()
+        objects, when = [], time.time()
+        for name in names:
+            digest = batch[name]
+            file = manifest.object_for(digest)
+            if file is None:
+                source = self._outgoing(name, staged)
+                file = digest + os.path.splitext(source)[1].lower()
+                path = os.path.join(self._staging(), file)
+                if os.path.exists(path):
+                    os.remove(path)
+                try:
+                    os.link(source, path)
+                except OSError:
+                    shutil.copy2(source, path)
+                staged.append(path)
+                objects.append(path)
+            manifest.add(name, digest, file, os.path.getsize(os.path.join(self.exports_dir, name)), when)
+        if objects:
+            self.transport.send(objects, STORE_DIR)
+        manifest_path = os.path.join(self._staging(), MANIFEST)
+        manifest.save(manifest_path)
+        staged.append(manifest_path)
+        self.transport.send([manifest_path], STORE_DIR)
+        self.manifest = manifest
+        manifest.save(self.manifest_path)
+        return len(names) - len(objects)
+
+    def _send_traces(self, names, detected, started, finished):
+        """Forward the plugin's trace sidecars for delivered exports, with the sync stages added."""
+        staged = []
+        for name in names:
+            try:
+                with open(os.path.join(self.exports_dir, name + tracing.SUFFIX)) as f:
+                    trace = json.load(f)
+                mtime = os.path.getmtime(os.path.join(self.exports_dir, name))
+            except (OSError, ValueError):
+                continue
+            stages = trace.setdefault("stages", {})
+            if stages.get("save", 0) < mtime - 1:
+                continue    # left over from an earlier export of this name
+            stages.update(detect=detected.get(name) or started, send=started, sent=finished)
+            trace["transport"] = self.transport.name
+            remote = name
+            if self.raw and name.lower().endswith(".png") and self.manifest is None:
+                remote = os.path.splitext(name)[0] + rawpix.SUFFIX
+            path = os.path.join(self._staging(), remote + tracing.SUFFIX)
+            with open(path, "w") as f:
+                json.dump(trace, f)
+            staged.append(path)
+        try:
+            if staged:
+                self.transport.send(staged)
+        except Exception as e:
+            log(f"{self.transport.name}: could not send traces ({e})")
+        finally:
+            for path in staged:
+                os.remove(path)
+
+    def send(self, batch):
+        detected = {name: self._changed_at.get(name) for name in batch}
+        started = time.time()
+        done, states = self._send_deltas(batch)
+        rest = sorted(name for name in batch if name not in done)
+        staged = []
+        deduped = 0
+        try:
+            if rest and self.manifest is not None:
+                deduped = self._send_store(rest, batch, staged)
+            elif rest:
+                self.transport.send([self._outgoing(name, staged) for name in rest])
+        except Exception as e:
+            self._failures += 1
+            delay = min(self.max_backoff, 2 ** (self._failures - 1))
+            self._retry_at = time.monotonic() + delay
+            for name in rest:
+                self._pending.setdefault(name, 0.0)
+            log(f"{self.transport.name}: send failed ({e}); retrying in {delay:.0f}s")
+            self.last_error = str(e)
+            rest = []
+        else:
+            self._failures = 0
+            self.last_error = None
+        finally:
+            for path in staged:
+                os.remove(path)
+
+        delivered = sorted(done) + rest
+        if self.trace and delivered:
+            self._send_traces(delivered, detected, started, time.time())
+        for name in delivered:
+            self.sent[name] = batch[name]
+            self._changed_at.pop(name, None)
+            self.retention.touch(name)
+            if self.deltas is not None:
+                self.deltas.acknowledge(name, states.get(name))
+        if delivered:
+            self.last_sent = time.time()
+            self._save_state()
+            log(f"{self.transport.name}: sent {', '.join(delivered)}"
+                + (f" ({len(done)} as delta)" if done else "")
+                + (f" ({deduped} already stored)" if deduped else ""))
+        return len(delivered)
+
+    def prune(self):
+        """Apply the age limit and quota to exports that are already sent."""
+        if not self.retention.enabled:
+            return
+        unsent = set(self._pending) | set(self._changed_at)
+        if self.protect is not None:
+            unsent |= self.protect()
+        evicted = self.retention.enforce(protected=unsent)
+        if evicted:
+            delete_files(self.exports_dir, evicted)
+            for name in evicted:
+                self.sent.pop(name, None)
+                self._seen.pop(name, None)
+            self._save_state()
+            log(f"removed {len(evicted)} old export(s)")
+        self.retention.save()
+
+    def pull(self):
+        """Fetch SaveImageToPhotoshop results every pull_interval seconds."""
+        now = time.monotonic()
+        if not self.pull_dir or now - self._last_pull < self.pull_interval:
+            return
+        self._last_pull = now
+        try:
+            self.transport.pull(self.pull_dir)
+        except Exception as e:
+            log(f"{self.transport.name}: pull failed ({e})")
+
+    def unsent(self):
+        """Names changed since their last delivery (including ones still settling)."""
+        return set(self._changed_at.copy())
+
+    def status(self):
+        changed = self._changed_at.copy()
+        oldest = min(changed.values(), default=None)
+        return {
+            "target": self.transport.name,
+            "state": "retrying" if self._failures else ("syncing" if changed else "idle"),
+            "pending": len(changed),
+            "lag_s": round(time.time() - oldest, 1) if oldest else 0.0,
+            "failures": self._failures,
+            "retry_in_s": round(max(0.0, self._retry_at - time.monotonic()), 1),
+            "last_sent": self.last_sent,
+            "last_error": self.last_error,
+        }
+
+    def step(self):
+        self.poll()
+        self.prune()
+        self.pull()
+
+    def run(self):
+        os.makedirs(self.exports_dir, exist_ok=True)
+        log(f"watching {self.exports_dir} -> {self.transport.name}")
+        try:
+            while True:
+                self.step()
+                time.sleep(self.poll_interval)
+        finally:
+            self.transport.close()
@@ -0,0 +1,193 @@
+"""
+Tile-delta transfer format for repeated exports of the same document.
+
+A .psdelta file carries only the tiles that changed since a base version the
+receiver already holds, identified by the sender's content hash of each file:
+
+    header  magic "PSDT", version, width, height, channels, tile size,
+            base id (16 bytes), new id (16 bytes), tile count
+    tiles   tile index, zlib length, zlib(raw uint8 tile rows)
+
+The sender keeps one tile-hash table per file name for the last version the
+receiver acknowledged; the receiver patches its decoded frame in place.
+"""
+
+import os
+import zlib
+import struct
+import hashlib
+
+import numpy as np
+from PIL import Image
+
+from .hashing import hash_file
+
+MAGIC = b"PSDT"
+VERSION = 1
+SUFFIX = ".psdelta"
+HEADER = struct.Struct("<4sBIIBH16s16sI")
+TILE = struct.Struct("<II")
+
+
+class DeltaMismatch(Exception):
+    """The receiver does not hold the base version a delta was made against."""
+
+
+def grid(height, width, tile):
+    return -(-height // tile), -(-width // tile)
+
+
+def tile_box(index, height, width, tile):
+    """(top, bottom, left, right) of a tile index in row-major order."""
+    cols = -(-width // tile)
+    top, left = (index // cols) * tile, (index % cols) * tile
+    return top, min(top + tile, height), left, min(left + tile, width)
+
+
+def tile_hashes(frame, tile):
+    height, width = frame.shape[:2]
+    rows, cols = grid(height, width, tile)
+    return [hashlib.blake2b(np.ascontiguousarray(frame[r * tile:(r + 1) * tile,
+                                                       c * tile:(c + 1) * tile]),
+                            digest_size=8).digest()
+            for r in range(rows) for c in range(cols)]
+
+
+def read_frame(path):
+    """uint8 [H,W,3|4] pixels the same way the pod decodes them, or None."""
+    with Image.open(path) as img:
+        if img.mode.startswith('I') or img.mode == 'F':
+            return None
+        if img.mode in ('PA', 'RGBa', 'La', 'LA'):
+            img = img.convert('RGBA')
+        elif img.mode == 'L':
+            img = img.convert('RGB')
+        elif img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        return np.asarray(img)
+
+
+def encode(frame, indices, tile, base_id, new_id, level=1):
+    height, width, channels = frame.shape
+    parts = [HEADER.pack(MAGIC, VERSION, width, height, channels, tile,
+                         bytes.fromhex(base_id), bytes.fromhex(new_id), len(indices))]
+    for index in indices:
+        top, bottom, left, right = tile_box(index, height, width, tile)
+        data = zlib.compress(np.ascontiguousarray(frame[top:bottom, left:right]).tobytes(), level)
+        parts.append(TILE.pack(index, len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def decode(payload):
+    """(header dict, [(top, bottom, left, right, uint8 tile)])."""
+    magic, version, width, height, channels, tile, base_id, new_id, count = \
+        HEADER.unpack_from(payload, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a tile delta")
+    header = {"width": width, "height": height, "channels": channels, "tile": tile,
+              "base_id": base_id.hex(), "new_id": new_id.hex()}
+    tiles, pos = [], HEADER.size
+    for _ in range(count):
+        index, length = TILE.unpack_from(payload, pos)
+        pos += TILE.size
+        top, bottom, left, right = tile_box(index, height, width, tile)
+        raw = zlib.decompress(payload[pos:pos + length])
+        pos += length
+        tiles.append((top, bottom, left, right,
+                      np.frombuffer(raw, np.uint8).reshape(bottom - top, right - left, channels)))
+    return header, tiles
+
+
+class TileDeltaEncoder:
+    """Sender half: builds deltas against the last acknowledged version per name.
+
+    `prepare` returns (payload or None, pending state); the payload is None when
+    there is no usable base or too much changed, in which case the full file
+    should be sent. Either way, pass the state to `acknowledge` once the
+    receiver has the new version.
+    """
+
+    def __init__(self, tile=256, max_changed=0.5):
+        self.tile = tile
+        self.max_changed = max_changed
+        self._acked = {}    # name -> (id, shape, hashes)
+
+    def prepare(self, name, path, new_id):
+        frame = read_frame(path)
+        if frame is None:
+            return None, None
+        hashes = tile_hashes(frame, self.tile)
+        state = (new_id, frame.shape, hashes)
+        base = self._acked.get(name)
+        if base is None or base[1] != frame.shape:
+            return None, state
+        changed = [i for i, (old, new) in enumerate(zip(base[2], hashes)) if old != new]
+        if len(changed) > self.max_changed * len(hashes):
+            return None, state
+        return encode(frame, changed, self.tile, base[0], new_id), state
+
+    def acknowledge(self, name, state):
+        if state is None:
+            self._acked.pop(name, None)
+        else:
+            self._acked[name] = state
+
+    def forget(self, name):
+        self._acked.pop(name, None)
+
+
+class FrameReceiver:
+    """Receiver half on plain uint8 frames, for local stand-ins and benchmarks.
+
+    The base for a name is read from disk (and identified by its file hash) the
+    first time a delta arrives; patched frames are kept in memory and written
+    back as PNG only on `flush`.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._frames = {}   # name -> [id, frame, dirty, (mtime_ns, size) on disk]
+
+    def _base(self, name):
+        path = os.path.join(self.directory, name)
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        entry = self._frames.get(name)
+        if entry is not None and (entry[2] or entry[3] == signature):
+            return entry
+        frame = read_frame(path)
+        if frame is None:
+            raise DeltaMismatch(f"{name} cannot be patched")
+        entry = self._frames[name] = [hash_file(path), np.array(frame), False, signature]
+        return entry
+
+    def apply(self, name, payload):
+        header, tiles = decode(payload)
+        try:
+            entry = self._base(name)
+        except OSError:
+            raise DeltaMismatch(f"No base for {name}")
+        frame = entry[1]
+        if entry[0] != header["base_id"] or \
+                frame.shape != (header["height"], header["width"], header["channels"]):
+            raise DeltaMismatch(f"{name} is not at version {header['base_id']}")
+        for top, bottom, left, right, tile in tiles:
+            frame[top:bottom, left:right] = tile
+        entry[0], entry[2] = header["new_id"], True
+
+    def frame(self, name):
+        entry = self._frames.get(name)
+        return entry[1] if entry else None
+
+    def flush(self, compress_level=1):
+        for name, entry in self._frames.items():
+            if not entry[2]:
+                continue
+            path = os.path.join(self.directory, name)
+            tmp = os.path.join(self.directory, f".{name}.part")
+            mode = "RGBA" if entry[1].shape[2] == 4 else "RGB"
+            Image.fromarray(entry[1], mode).save(tmp, format="PNG", compress_level=compress_level)
+            os.replace(tmp, path)
+            st = os.stat(path)
+            entry[2], entry[3] = False, (st.st_mtime_ns, st.st_size)
@@ -0,0 +1,175 @@
+"""
+Fan-out sync: one exports folder pushed to several pods at once.
+
+Targets come from an INI file, one section per pod (see pods.example.ini):
+
+    [DEFAULT]
+    key = ~/.ssh/id_ed25519
+    concurrency = 2
+
+    [flux-a100]
+    ssh = 203.0.113.10
+    port = 22022
+
+    [sdxl]
+    http = https://PODID-8188.proxy.runpod.net
+
+Every target gets its own SyncAgent (sent-state, backoff, transports) on
+its own thread, so a slow or unreachable pod only delays itself. Content
+hashes are shared, and only the first target's agent prunes exports/,
+keeping anything another target has not received yet.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+import configparser
+
+from .agent import SyncAgent, log
+from .transports import HTTPTransport, LocalDirTransport, ParallelTransport, SSHTransport
+
+
+def load_targets(path):
+    """[(name, section)] from a targets INI file."""
+    cfg = configparser.ConfigParser()
+    if not cfg.read(os.path.expanduser(path)):
+        raise FileNotFoundError(f"No targets file at {path}")
+    targets = []
+    for name in cfg.sections():
+        section = cfg[name]
+        kinds = [k for k in ("ssh", "http", "dir") if section.get(k)]
+        if len(kinds) != 1:
+            raise ValueError(f"[{name}] needs exactly one of ssh, http or dir")
+        targets.append((name, section))
+    if not targets:
+        raise ValueError(f"{path} lists no targets")
+    return targets
+
+
+def make_transport(section):
+    if section.get("ssh"):
+        return SSHTransport(section["ssh"], port=section.getint("port", 22),
+                            key=section.get("key"), user=section.get("user", "root"))
+    if section.get("http"):
+        return HTTPTransport(section["http"])
+    return LocalDirTransport(os.path.expanduser(section["dir"]))
+
+
+class FanOutSync:
+    """Runs one SyncAgent per target and reports their status and lag.
+
+    Status is written to `.sync_status.json` next to the sync state every
+    `status_interval` seconds, and a line is logged whenever a target starts
+    or stops retrying.
+    """
+
+    def __init__(self, exports_dir, targets, state_dir=None, pull_dir=None,
+                 status_interval=5.0, **agent_options):
+        self.exports_dir = exports_dir
+        self.state_dir = state_dir or os.path.dirname(os.path.abspath(exports_dir))
+        self.status_path = os.path.join(self.state_dir, ".sync_status.json")
+        self.status_interval = status_interval
+        self._stop = threading.Event()
+        self._states = {}
+        hashes = {}
+        self.agents = {}
+        store = agent_options.pop("store", False)
+        trace = agent_options.pop("trace", False)
+        raw = agent_options.pop("raw", False)
+        raw_compress = agent_options.pop("raw_compress", False)
+        for i, (name, section) in enumerate(targets):
+            options = dict(agent_options)
+            if i:
+                options.update(max_age_days=0, quota_bytes=0)
+            concurrency = max(1, section.getint("concurrency", 2))
+            slug = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+            transport = ParallelTransport([make_transport(section) for _ in range(concurrency)])
+            self.agents[name] = SyncAgent(
+                exports_dir,
+                transport,
+                state_path=os.path.join(self.state_dir, f".sync_state.{slug}.json"),
+                pull_dir=os.path.join(pull_dir, slug) if pull_dir and transport.can_pull else None,
+                deltas=section.getboolean("deltas", True),
+                raw=section.getboolean("raw", raw),
+                raw_compress=section.getboolean("raw_compress", raw_compress),
+                store=section.getboolean("store", store),
+                trace=section.getboolean("trace", trace),
+                hash_cache=hashes,
+                protect=None if i else self.undelivered,
+                **options)
+
+    def undelivered(self):
+        """Names some target still needs; everything until all have scanned once."""
+        agents = list(self.agents.values())
+        if not all(agent.scanned for agent in agents):
+            return agents[0].retention.names()
+        names = set()
+        for agent in agents:
+            names |= agent.unsent()
+        return names
+
+    def status(self):
+        return {name: agent.status() for name, agent in self.agents.items()}
+
+    def write_status(self):
+        status = self.status()
+        for name, entry in status.items():
+            state = entry["state"] == "retrying"
+            if state != self._states.get(name, False):
+                log(f"{name}: " + (f"unreachable ({entry['last_error']})" if state
+                                   else f"back in sync, lag {entry['lag_s']:.0f}s"))
+            self._states[name] = state
+        tmp = self.status_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"time": time.time(), "targets": status}, f, indent=1)
+        os.replace(tmp, self.status_path)
+        return status
+
+    def _run_agent(self, name, agent):
+        try:
+            while not self._stop.is_set():
+                try:
+                    agent.step()
+                except Exception as e:
+                    log(f"{name}: {e}")
+                self._stop.wait(agent.poll_interval)
+        finally:
+            agent.transport.close()
+
+    def once(self):
+        """Send pending changes to every target in parallel, then return the status."""
+        def step(agent):
+            agent.debounce = 0
+            try:
+                agent.step()
+            finally:
+                agent.transport.close()
+
+        threads = [threading.Thread(target=step, args=(agent,), name=f"bridge_sync:{name}")
+                   for name, agent in self.agents.items()]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.write_status()
+
+    def run(self):
+        os.makedirs(self.exports_dir, exist_ok=True)
+        log(f"watching {self.exports_dir} -> {', '.join(self.agents)}")
+        threads = [threading.Thread(target=self._run_agent, args=item, daemon=True,
+                                    name=f"bridge_sync:{item[0]}")
+                   for item in self.agents.items()]
+        for t in threads:
+            t.start()
+        try:
+            while not self._stop.wait(self.status_interval):
+                self.write_status()
+        finally:
+            self.stop()
+            for t in threads:
+                t.join()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,15 @@
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """Streaming blake2b of a file; used as the version id of an export."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
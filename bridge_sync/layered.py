@@ -0,0 +1,129 @@
+"""
+Layered export container: one multi-page TIFF, a page per Photoshop layer
+cropped to that layer's own bounds.
+
+    <stack>.tif   one deflate-compressed page per layer, in export order
+                  ImageDescription: {"name", "left", "top",
+                                     "canvas_width", "canvas_height"}
+                  PageName: the layer name, for other TIFF readers
+
+The Photoshop plugin writes a "Selected Layers" export as a hidden folder of
+per-layer PNGs, exports/.<stack>.layers/, with layers.json written last. The
+sync agent packs that folder into exports/<stack>.tif, so the layers travel
+as one file. The pod reads the page table from the TIFF directories alone
+and decodes only the pages a graph uses.
+"""
+
+import os
+import json
+import threading
+
+from PIL import Image
+from PIL.TiffImagePlugin import AppendingTiffWriter
+
+SUFFIX = ".tif"
+STACK_SUFFIX = ".layers"
+INDEX = "layers.json"
+
+DESCRIPTION = 270
+PAGE_NAME = 285
+
+_pack_lock = threading.Lock()     # fan-out agents share one exports folder
+_failed = {}                      # stack folder -> index mtime_ns that failed to pack
+
+
+def is_stack(name):
+    return name.startswith(".") and name.endswith(STACK_SUFFIX)
+
+
+def container_path(stack_dir):
+    """exports/.<stack>.layers -> exports/<stack>.tif"""
+    head, tail = os.path.split(stack_dir.rstrip(os.sep))
+    return os.path.join(head, tail[1:-len(STACK_SUFFIX)] + SUFFIX)
+
+
+def pack(stack_dir, out_path):
+    """Write the container for a stack folder, atomically."""
+    with open(os.path.join(stack_dir, INDEX)) as f:
+        index = json.load(f)
+    canvas = {"canvas_width": int(index["canvas_width"]), "canvas_height": int(index["canvas_height"])}
+    head, tail = os.path.split(out_path)
+    tmp = os.path.join(head, f".{tail}.tmp")
+    try:
+        with AppendingTiffWriter(tmp, new=True) as tf:
+            for layer in index["layers"]:
+                with Image.open(os.path.join(stack_dir, layer["file"])) as img:
+                    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+                        img = img.convert("RGBA")
+                    description = dict(name=layer["name"], left=int(layer["left"]),
+                                       top=int(layer["top"]), **canvas)
+                    img.save(tf, "TIFF", compression="tiff_adobe_deflate", tiffinfo={
+                        DESCRIPTION: json.dumps(description),
+                        PAGE_NAME: layer["name"],
+                    })
+                tf.newFrame()
+        os.replace(tmp, out_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def pack_stale(stack_dir):
+    """Pack a stack folder if its layers.json is newer than the container.
+
+    Returns the container path when it was (re)built, else None. The plugin
+    removes layers.json before rewriting a stack, so a half-written stack is
+    never packed.
+    """
+    out_path = container_path(stack_dir)
+    with _pack_lock:
+        try:
+            written = os.stat(os.path.join(stack_dir, INDEX)).st_mtime_ns
+        except OSError:
+            return None
+        try:
+            if os.stat(out_path).st_mtime_ns >= written:
+                return None
+        except OSError:
+            pass
+        if _failed.get(stack_dir) == written:
+            return None
+        try:
+            pack(stack_dir, out_path)
+        except (OSError, ValueError, KeyError) as e:
+            _failed[stack_dir] = written
+            raise ValueError(f"Could not pack {os.path.basename(stack_dir)}: {e}") from e
+        _failed.pop(stack_dir, None)
+        return out_path
+
+
+def read_pages(path):
+    """((canvas_width, canvas_height), [page]) from the TIFF directories, without decoding.
+
+    A page is {"name", "left", "top", "width", "height"}. Any multi-page TIFF
+    works; pages without a description sit at 0,0 on a canvas the size of
+    the first page.
+    """
+    pages = []
+    canvas = None
+    with Image.open(path) as img:
+        for i in range(getattr(img, "n_frames", 1)):
+            img.seek(i)
+            tags = getattr(img, "tag_v2", {})
+            try:
+                meta = json.loads(tags.get(DESCRIPTION) or "{}")
+            except ValueError:
+                meta = {}
+            if not isinstance(meta, dict):
+                meta = {}
+            if canvas is None:
+                canvas = (int(meta.get("canvas_width", img.width)), int(meta.get("canvas_height", img.height)))
+            pages.append({
+                "name": str(meta.get("name") or tags.get(PAGE_NAME) or f"Layer {i + 1}"),
+                "left": int(meta.get("left", 0)),
+                "top": int(meta.get("top", 0)),
+                "width": img.width,
+                "height": img.height,
+            })
+    return canvas, pages
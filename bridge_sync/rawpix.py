@@ -0,0 +1,122 @@
+"""
+Raw-pixel container (.psraw): the pixels as the pod wants them, with no
+image codec in between.
+
+    header  magic "PSRW", version, width, height, channels (1-4),
+            bytes per sample (1 or 2), compression, payload length
+    pad     zeros up to DATA_OFFSET, so the pixels are page-aligned
+    pixels  [height, width, channels] uint8 / little-endian uint16,
+            raw or compressed as one stream
+
+Uncompressed files are read through a memory map: a crop only touches the
+pages it covers. Compression is LZ4 when the `lz4` package is installed on
+both ends, else zlib at level 1; both are far cheaper to undo than PNG.
+"""
+
+import os
+import zlib
+import mmap
+import struct
+
+import numpy as np
+
+try:
+    import lz4.frame as lz4
+except ImportError:
+    lz4 = None
+
+MAGIC = b"PSRW"
+VERSION = 1
+SUFFIX = ".psraw"
+HEADER = struct.Struct("<4sBIIBBBQ")
+DATA_OFFSET = 4096
+
+RAW, ZLIB, LZ4 = 0, 1, 2
+DTYPES = {1: np.dtype(np.uint8), 2: np.dtype("<u2")}
+
+
+def read_header(f):
+    """(width, height, channels, sample_bytes, compression, length) from an open file."""
+    data = f.read(HEADER.size)
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated raw-pixel header")
+    magic, version, width, height, channels, sample_bytes, compression, length = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a raw-pixel file")
+    if sample_bytes not in DTYPES or not 1 <= channels <= 4:
+        raise ValueError(f"Unsupported raw-pixel layout ({channels} x {sample_bytes} bytes)")
+    return width, height, channels, sample_bytes, compression, length
+
+
+def image_size(path):
+    with open(path, "rb") as f:
+        width, height = read_header(f)[:2]
+    return width, height
+
+
+def read(path):
+    """[H, W, C] uint8/uint16 array; memory-mapped (read-only) when uncompressed."""
+    with open(path, "rb") as f:
+        width, height, channels, sample_bytes, compression, length = read_header(f)
+        shape = (height, width, channels)
+        dtype = DTYPES[sample_bytes]
+        if compression == RAW:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return np.frombuffer(mm, dtype, count=height * width * channels,
+                                 offset=DATA_OFFSET).reshape(shape)
+        f.seek(DATA_OFFSET)
+        payload = f.read(length)
+    if compression == LZ4:
+        if lz4 is None:
+            raise RuntimeError("This .psraw file is LZ4-compressed; install the lz4 package")
+        raw = lz4.decompress(payload)
+    elif compression == ZLIB:
+        raw = zlib.decompress(payload)
+    else:
+        raise ValueError(f"Unknown raw-pixel compression {compression}")
+    return np.frombuffer(raw, dtype).reshape(shape)
+
+
+def write(pixels, path, compress=False):
+    """Write an [H, W, C] (or [H, W]) uint8/uint16 array atomically."""
+    if pixels.ndim == 2:
+        pixels = pixels[..., None]
+    height, width, channels = pixels.shape
+    dtype = DTYPES[2] if pixels.dtype.itemsize == 2 else DTYPES[1]
+    data = np.ascontiguousarray(pixels, dtype=dtype)
+    compression = RAW
+    if compress:
+        compression = LZ4 if lz4 is not None else ZLIB
+        data = lz4.compress(data) if lz4 is not None else zlib.compress(data, 1)
+    length = len(data) if compression != RAW else data.nbytes
+
+    head, tail = os.path.split(path)
+    tmp = os.path.join(head, f".{tail}.part")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, height, channels, dtype.itemsize,
+                            compression, length))
+        f.write(b"\0" * (DATA_OFFSET - HEADER.size))
+        f.write(memoryview(data).cast("B") if compression == RAW else data)
+    os.replace(tmp, path)
+
+
+def from_image(img):
+    """Pixels of a PIL image in the layout the pod decodes to (L/LA/RGB/RGBA, 8 or 16 bit)."""
+    if img.mode in ('I;16', 'I;16L', 'I;16B', 'I;16N'):
+        return np.asarray(img).astype("<u2", copy=False)
+    if img.mode == 'I':
+        return np.clip(np.asarray(img), 0, 65535).astype("<u2")
+    if img.mode == 'P' or img.mode == 'PA':
+        img = img.convert('RGBA' if img.mode == 'PA' or 'transparency' in img.info else 'RGB')
+    elif img.mode in ('RGBa', 'La'):
+        img = img.convert('RGBA')
+    elif img.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    return np.asarray(img)
+
+
+def convert_file(src, dst, compress=False):
+    """Re-encode an exported image (PNG etc.) as .psraw."""
+    from PIL import Image
+    with Image.open(src) as img:
+        write(from_image(img), dst, compress)
@@ -0,0 +1,126 @@
+"""
+Age and byte-quota retention shared by the sync agent and the pod-side nodes.
+"""
+
+import os
+import json
+import heapq
+import time
+
+
+class RetentionIndex:
+    """Tracks size and last use per file and picks files to evict.
+
+    Eviction order is least recently used, where "used" is the later of the
+    file's mtime and its last load (or send). A min-heap with lazy deletion
+    keeps each `enforce` proportional to the number of evictions and updates
+    since the previous one rather than to the folder size.
+    """
+
+    def __init__(self, max_age_days=0, quota_bytes=0, state_path=None):
+        self.max_age = max_age_days * 86400
+        self.quota_bytes = quota_bytes
+        self.state_path = state_path
+        self.total_bytes = 0
+        self._entries = {}      # name -> (size, last_used)
+        self._heap = []         # (last_used, name)
+        self._dirty = False
+        self._load()
+
+    @property
+    def enabled(self):
+        return bool(self.max_age or self.quota_bytes)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def names(self):
+        return set(self._entries)
+
+    def update(self, name, size, mtime):
+        """Record a new or rewritten file."""
+        old = self._entries.get(name)
+        last_used = max(mtime, old[1]) if old else mtime
+        self._set(name, size, last_used)
+
+    def touch(self, name, when=None):
+        """Mark a file as just loaded/sent."""
+        old = self._entries.get(name)
+        if old is not None:
+            self._set(name, old[0], when or time.time())
+
+    def remove(self, name):
+        old = self._entries.pop(name, None)
+        if old is not None:
+            self.total_bytes -= old[0]
+            self._dirty = True
+
+    def enforce(self, protected=(), now=None):
+        """Names to delete (already dropped from the index)."""
+        now = now or time.time()
+        cutoff = now - self.max_age if self.max_age else None
+        evicted, skipped = [], []
+        while self._heap:
+            last_used, name = self._heap[0]
+            entry = self._entries.get(name)
+            if entry is None or entry[1] != last_used:
+                heapq.heappop(self._heap)       # stale heap record
+                continue
+            expired = cutoff is not None and last_used < cutoff
+            over_quota = self.quota_bytes and self.total_bytes > self.quota_bytes
+            if not (expired or over_quota):
+                break
+            heapq.heappop(self._heap)
+            if name in protected:
+                skipped.append((last_used, name))
+                continue
+            self.remove(name)
+            evicted.append(name)
+        for item in skipped:
+            heapq.heappush(self._heap, item)
+        return evicted
+
+    def _set(self, name, size, last_used):
+        old = self._entries.get(name)
+        if old is not None:
+            self.total_bytes -= old[0]
+        self._entries[name] = (size, last_used)
+        self.total_bytes += size
+        heapq.heappush(self._heap, (last_used, name))
+        self._dirty = True
+        if len(self._heap) > 4 * len(self._entries) + 64:
+            self._heap = [(e[1], n) for n, e in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+    def _load(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, (size, last_used) in entries.items():
+            self._set(name, size, last_used)
+        self._dirty = False
+
+    def save(self):
+        if not self.state_path or not self._dirty:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.state_path)
+        self._dirty = False
+
+
+def delete_files(directory, names):
+    """Delete files along with their <name>.json region sidecars."""
+    for name in names:
+        path = os.path.join(directory, name)
+        for target in (path, os.path.splitext(path)[0] + ".json"):
+            try:
+                os.remove(target)
+            except OSError:
+                pass
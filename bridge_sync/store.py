@@ -0,0 +1,100 @@
+"""
+Content-addressed export store: every version of an export is kept once,
+under its content hash, in a `store/` folder next to the bridge files.
+
+    store/<hash><ext>    immutable objects, one per distinct content
+    store/manifest.json  {"names": {"ps_layer.png": [version, ...]}}
+
+A version is {"hash", "file", "size", "time"}; version N is entry N-1 and the
+last entry is the latest. The sender uploads new objects first and the
+manifest last, so a manifest never names an object the pod does not have,
+and re-sending anything is harmless.
+
+Pod retention may delete objects of older versions (never a latest one);
+those versions stay in the manifest marked "evicted" so numbering does not
+shift. The sender therefore only reuses objects of latest versions and
+uploads anything else again, which also restores an evicted object.
+"""
+
+import os
+import json
+
+STORE_DIR = "store"
+MANIFEST = "manifest.json"
+
+
+class Manifest:
+    def __init__(self, names=None):
+        self.names = names or {}
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path) as f:
+                return cls(json.load(f).get("names", {}))
+        except (OSError, ValueError):
+            return cls()
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"names": self.names}, f)
+        os.replace(tmp, path)
+
+    def copy(self):
+        return Manifest({name: list(versions) for name, versions in self.names.items()})
+
+    def objects(self):
+        return {v["file"] for versions in self.names.values() for v in versions}
+
+    def latest_objects(self):
+        """Files of latest versions, which pod retention never deletes."""
+        return {versions[-1]["file"] for versions in self.names.values() if versions}
+
+    def object_for(self, digest):
+        """File of a latest version already holding this content, or None."""
+        for versions in self.names.values():
+            if versions and versions[-1]["hash"] == digest:
+                return versions[-1]["file"]
+        return None
+
+    def evict(self, files):
+        """Mark every version stored in one of `files` as evicted."""
+        for versions in self.names.values():
+            for v in versions:
+                if v["file"] in files:
+                    v["evicted"] = True
+
+    def add(self, name, digest, file, size, when):
+        """Record a new version; False if it is already the latest."""
+        versions = self.names.setdefault(name, [])
+        if versions and versions[-1]["hash"] == digest:
+            return False
+        versions.append({"hash": digest, "file": file, "size": size, "time": when})
+        return True
+
+    def resolve(self, name, version=0):
+        """(version number, entry) for `name`; version 0 means latest."""
+        versions = self.names.get(name)
+        if not versions:
+            return None
+        number = len(versions) if version <= 0 else version
+        if number > len(versions) or versions[number - 1].get("evicted"):
+            return None
+        return number, versions[number - 1]
+
+    def companion(self, name, version, other):
+        """The version of `other` (e.g. a sidecar) that belongs with `name` at `version`.
+
+        That is the newest `other` sent before the next version of `name`, since
+        a sidecar may land a moment after its image.
+        """
+        versions, companions = self.names.get(name, []), self.names.get(other, [])
+        if not companions or not 1 <= version <= len(versions):
+            return None
+        until = versions[version]["time"] if version < len(versions) else float("inf")
+        match = None
+        for entry in companions:
+            if entry["time"] < until:
+                match = entry
+        return match
@@ -0,0 +1,102 @@
+"""
+Export-to-tensor latency traces.
+
+The plugin writes `<export>.trace.json` next to each export: an export ID
+and wall-clock stage timestamps (click, duplicate, flatten, save). With
+--trace, the sync agent adds when it noticed the file (detect), started
+sending it (send) and got the transfer acknowledged (sent), then forwards
+the trace. The first Load from Photoshop of that export adds arrive (the
+file's ctime on the pod), load and ready, and appends the trace to
+`.traces.jsonl` in the bridge folder.
+
+Plugin and agent share the Mac's clock; intervals that cross to the pod
+(upload, wait) also contain any offset between the two clocks.
+
+    python3 -m bridge_sync.tracing https://PODID-8188.proxy.runpod.net
+    python3 -m bridge_sync.tracing /workspace/ComfyUI/input/photoshop_bridge/.traces.jsonl
+"""
+
+import json
+import argparse
+import urllib.request
+
+SUFFIX = ".trace.json"
+LOG = ".traces.jsonl"
+
+# (interval, from stage, to stage), in pipeline order
+INTERVALS = (
+    ("duplicate", "click", "duplicate"),    # Photoshop: duplicate + isolate layer
+    ("flatten", "duplicate", "flatten"),
+    ("save", "flatten", "save"),            # PNG encode and write
+    ("detect", "save", "detect"),           # until the agent's poll saw the file
+    ("debounce", "detect", "send"),
+    ("transfer", "send", "sent"),
+    ("upload", "send", "arrive"),           # crosses clocks
+    ("wait", "arrive", "load"),             # on the pod until a graph loaded it
+    ("load", "load", "ready"),              # decode (or tensor-cache hit)
+    ("export_to_pod", "click", "arrive"),   # crosses clocks
+    ("total", "click", "ready"),            # crosses clocks
+)
+
+
+def intervals(stages):
+    """{interval: seconds} for every interval whose two stages were recorded."""
+    return {name: stages[end] - stages[start] for name, start, end in INTERVALS
+            if start in stages and end in stages}
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list."""
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+def summarize(traces):
+    """{"count", "intervals": {name: {"n", "mean", "p50", "p90", "p99", "max"}}}"""
+    samples = {}
+    for trace in traces:
+        for name, seconds in intervals(trace.get("stages", {})).items():
+            samples.setdefault(name, []).append(seconds)
+    table = {}
+    for name, _, _ in INTERVALS:
+        values = sorted(samples.get(name, ()))
+        if values:
+            table[name] = {
+                "n": len(values),
+                "mean": sum(values) / len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": values[-1],
+            }
+    return {"count": len(traces), "intervals": table}
+
+
+def format_report(report):
+    lines = [f"{report['count']} traced exports",
+             f"{'interval':<15}{'n':>5}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}"]
+    for name, row in report["intervals"].items():
+        lines.append(f"{name:<15}{row['n']:>5}" + "".join(
+            f"{row[k] * 1000:>7.0f}ms" for k in ("p50", "p90", "p99", "max")))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python3 -m bridge_sync.tracing",
+                                     description="Per-stage export latency percentiles.")
+    parser.add_argument("source", help="ComfyUI base URL, or a .traces.jsonl file")
+    parser.add_argument("--limit", type=int, default=200, help="most recent exports to include")
+    args = parser.parse_args()
+
+    if args.source.startswith(("http://", "https://")):
+        url = f"{args.source.rstrip('/')}/photoshop_bridge/traces?limit={args.limit}"
+        with urllib.request.urlopen(url, timeout=30) as resp:
+            report = json.load(resp)
+    else:
+        with open(args.source) as f:
+            traces = [json.loads(line) for line in f if line.strip()]
+        report = summarize(traces[-args.limit:])
+    print(format_report(report))
+
+
+if __name__ == "__main__":
+    main()
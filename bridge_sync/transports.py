@@ -0,0 +1,232 @@
+"""
+Transports used by the sync agent. Each one keeps its connection open
+between batches and raises on failure so the agent can retry.
+"""
+
+import os
+import shutil
+import subprocess
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+
+class Transport:
+    """Delivers local files into the remote bridge folder under their base name.
+
+    `subdir` names a folder inside the bridge folder (the export store).
+    """
+
+    name = "transport"
+    can_pull = False
+    supports_deltas = False     # send_delta(name, payload) -> bool is usable
+
+    def send(self, paths, subdir=""):
+        raise NotImplementedError
+
+    def pull(self, local_dir):
+        """Fetch new results from the pod's outbox into `local_dir` (if `can_pull`)."""
+        raise NotImplementedError(f"{self.name} cannot pull results")
+
+    def close(self):
+        pass
+
+
+class LocalDirTransport(Transport):
+    """Copies into a local directory with temp-then-rename, like the upload route.
+
+    With `deltas=True` it also accepts tile deltas through a FrameReceiver,
+    standing in for the pod's /photoshop_bridge/delta route.
+    """
+
+    def __init__(self, directory, deltas=False):
+        self.directory = directory
+        self.name = f"dir:{directory}"
+        self.receiver = None
+        self.supports_deltas = deltas
+        if deltas:
+            from .delta import FrameReceiver
+            self.receiver = FrameReceiver(directory)
+
+    def send(self, paths, subdir=""):
+        directory = os.path.join(self.directory, subdir)
+        os.makedirs(directory, exist_ok=True)
+        for path in paths:
+            base = os.path.basename(path)
+            tmp = os.path.join(directory, f".{base}.part")
+            shutil.copy2(path, tmp)
+            os.replace(tmp, os.path.join(directory, base))
+
+    def send_delta(self, name, payload):
+        if self.receiver is None:
+            return False
+        from .delta import DeltaMismatch
+        try:
+            self.receiver.apply(name, payload)
+        except DeltaMismatch:
+            return False
+        return True
+
+    def close(self):
+        if self.receiver is not None:
+            self.receiver.flush()
+
+
+class SSHTransport(Transport):
+    """rsync over one multiplexed SSH connection (ControlMaster) per pod.
+
+    The first batch opens the master connection; later batches reuse it, so
+    they skip the TCP and key-exchange handshake entirely.
+    """
+
+    REMOTE_DIR = "/workspace/ComfyUI/input/photoshop_bridge/"
+    REMOTE_OUTBOX = "/workspace/ComfyUI/output/photoshop_bridge/"
+
+    def __init__(self, host, port=22, key=None, user="root", remote_dir=REMOTE_DIR,
+                 remote_outbox=REMOTE_OUTBOX, persist="10m"):
+        self.destination = f"{user}@{host}:{remote_dir}"
+        self.outbox = f"{user}@{host}:{remote_outbox}"
+        self.name = f"ssh:{host}:{port}"
+        control_path = os.path.expanduser(f"~/.ssh/cm-bridge-{user}@{host}:{port}")
+        self.ssh_cmd = [
+            "ssh", "-p", str(port),
+            "-o", "ConnectTimeout=5",
+            "-o", "StrictHostKeyChecking=no",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={control_path}",
+            "-o", f"ControlPersist={persist}",
+        ]
+        if key:
+            self.ssh_cmd += ["-i", os.path.expanduser(key)]
+        self.host = f"{user}@{host}"
+
+    def send(self, paths, subdir=""):
+        # PNG data is already deflated, so no -z.
+        destination = self.destination + (subdir.strip("/") + "/" if subdir else "")
+        cmd = ["rsync", "-t", "--no-perms", "--no-owner", "--no-group",
+               "-e", " ".join(self.ssh_cmd)] + list(paths) + [destination]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"rsync exited {result.returncode}: {result.stderr.strip()}")
+
+    can_pull = True
+
+    def pull(self, local_dir):
+        os.makedirs(local_dir, exist_ok=True)
+        cmd = ["rsync", "-rt", "--no-perms", "--no-owner", "--no-group", "--exclude", ".*",
+               "-e", " ".join(self.ssh_cmd), self.outbox, local_dir.rstrip("/") + "/"]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"rsync exited {result.returncode}: {result.stderr.strip()}")
+
+    def close(self):
+        subprocess.run(self.ssh_cmd + ["-O", "exit", self.host], capture_output=True)
+
+
+class HTTPTransport(Transport):
+    """Streams files to /photoshop_bridge/upload on one keep-alive connection."""
+
+    supports_deltas = True
+
+    def __init__(self, base_url, decode=True, timeout=60):
+        parts = urlsplit(base_url.rstrip("/"))
+        self.https = parts.scheme == "https"
+        self.netloc = parts.netloc
+        self.prefix = parts.path
+        self.decode = decode
+        self.timeout = timeout
+        self.name = f"http:{parts.netloc}"
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.netloc, timeout=self.timeout)
+        return self._conn
+
+    def send(self, paths, subdir=""):
+        query = "&".join(q for q in (f"subdir={quote(subdir)}" if subdir else "",
+                                     "decode=1" if self.decode else "") if q)
+        for path in paths:
+            url = f"{self.prefix}/photoshop_bridge/upload/{quote(os.path.basename(path))}"
+            if query:
+                url += "?" + query
+            try:
+                with open(path, "rb") as f:
+                    conn = self._connection()
+                    conn.request("PUT", url, body=f, headers={
+                        "Content-Length": str(os.fstat(f.fileno()).st_size),
+                        "Content-Type": "application/octet-stream",
+                    })
+                    resp = conn.getresponse()
+                    body = resp.read()
+            except (OSError, http.client.HTTPException):
+                self.close()
+                raise
+            if resp.status >= 300:
+                raise RuntimeError(f"Upload failed ({resp.status}): {body[:200]!r}")
+
+    def send_delta(self, name, payload):
+        """PUT a tile delta; False when the pod lacks the base version (409)."""
+        url = f"{self.prefix}/photoshop_bridge/delta/{quote(name)}"
+        try:
+            conn = self._connection()
+            conn.request("PUT", url, body=payload, headers={
+                "Content-Type": "application/octet-stream",
+            })
+            resp = conn.getresponse()
+            body = resp.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if resp.status == 409:
+            return False
+        if resp.status >= 300:
+            raise RuntimeError(f"Delta failed ({resp.status}): {body[:200]!r}")
+        return True
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class ParallelTransport(Transport):
+    """Splits each batch over several copies of one transport, sent concurrently.
+
+    Each copy keeps its own connection (SSH copies share the ControlMaster).
+    A batch fails if any part fails; the agent then resends all of it, which
+    is harmless since every transport replaces files atomically.
+    """
+
+    def __init__(self, transports):
+        self.transports = list(transports)
+        self.name = self.transports[0].name
+        self.can_pull = self.transports[0].can_pull
+        self._pool = None
+        if len(self.transports) > 1:
+            self._pool = ThreadPoolExecutor(len(self.transports), thread_name_prefix="bridge_send")
+        self.supports_deltas = self.transports[0].supports_deltas
+        if self.supports_deltas:
+            self.send_delta = self.transports[0].send_delta
+
+    def send(self, paths, subdir=""):
+        if self._pool is None or len(paths) < 2:
+            return self.transports[0].send(paths, subdir)
+        n = len(self.transports)
+        jobs = [self._pool.submit(t.send, paths[i::n], subdir)
+                for i, t in enumerate(self.transports) if paths[i::n]]
+        errors = [job.exception() for job in jobs]     # wait for every part
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def pull(self, local_dir):
+        return self.transports[0].pull(local_dir)
+
+    def close(self):
+        for t in self.transports:
+            t.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
@@ -1,3 +1,9 @@
-from .nodes import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS
+from .nodes import NODE_CLASS_MAPPINGS, NODE_DISPLAY_NAME_MAPPINGS, LoadFromPhotoshop, TENSOR_CACHE
+from . import routes  # noqa: F401  (registers HTTP routes)
+from . import autoqueue, retention, watcher
+
+watcher.start_if_enabled()
+autoqueue.start_if_enabled()
+retention.start_if_enabled(LoadFromPhotoshop.bridge_dir(), LoadFromPhotoshop.index(), TENSOR_CACHE)
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS']
@@ -0,0 +1,155 @@
+"""
+Arrival notifications and auto-queue for the bridge folder.
+
+With PS_BRIDGE_NOTIFY=1 every completed arrival is pushed to connected
+clients as a `photoshop_bridge.arrival` event carrying the file name and
+size. With PS_BRIDGE_AUTOQUEUE set, a pinned API-format workflow is
+re-submitted with its Photoshop loaders pointed at the new file; a burst of
+exports inside the delay queues only the last one.
+"""
+
+import os
+import json
+import threading
+
+from .decode import image_size
+from .fal import session
+from .nodes import LoadFromPhotoshop
+from .watcher import get_watcher
+
+NOTIFY = os.environ.get("PS_BRIDGE_NOTIFY", "").strip().lower() in ("1", "true", "yes")
+# "1" pins through the /photoshop_bridge/autoqueue route; anything else is a workflow path.
+AUTOQUEUE = os.environ.get("PS_BRIDGE_AUTOQUEUE", "").strip()
+DELAY = float(os.environ.get("PS_BRIDGE_AUTOQUEUE_DELAY", "1.5"))
+COMFY_URL = os.environ.get("PS_BRIDGE_COMFY_URL", "").strip()
+
+EVENT = "photoshop_bridge.arrival"
+LOADER_TYPES = ("LoadFromPhotoshop", "LoadRegionFromPhotoshop")
+
+
+def _server():
+    from server import PromptServer
+    return PromptServer.instance
+
+
+def notify(name, path):
+    try:
+        width, height = image_size(path)
+    except Exception:
+        width = height = None
+    _server().send_sync(EVENT, {
+        "name": name,
+        "subfolder": LoadFromPhotoshop.SUBFOLDER,
+        "width": width,
+        "height": height,
+    })
+
+
+def point_at(prompt, name):
+    """Copy of an API-format prompt with every Photoshop loader reading `name`."""
+    prompt = json.loads(json.dumps(prompt))
+    hits = 0
+    for node in prompt.values():
+        if isinstance(node, dict) and node.get("class_type") in LOADER_TYPES:
+            node.setdefault("inputs", {})["image"] = name
+            hits += 1
+    return prompt, hits
+
+
+def queue_prompt(prompt):
+    """Submit through this server's own /prompt route, so validation matches the UI."""
+    base = COMFY_URL
+    if not base:
+        server = _server()
+        host = getattr(server, "address", None) or "127.0.0.1"
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+        base = f"http://{host}:{getattr(server, 'port', 8188)}"
+    resp = session().post(f"{base.rstrip('/')}/prompt", json={
+        "prompt": prompt, "client_id": "photoshop_bridge",
+    }, timeout=30)
+    if not resp.ok:
+        raise RuntimeError(f"/prompt rejected the workflow ({resp.status_code}): {resp.text[:500]}")
+    return resp.json().get("prompt_id")
+
+
+class AutoQueue:
+    """Arrival listener that queues the pinned workflow once arrivals pause for `delay` seconds."""
+
+    def __init__(self, workflow_path, delay=DELAY):
+        self.workflow_path = workflow_path
+        self.delay = delay
+        self._latest = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def pinned(self):
+        try:
+            with open(self.workflow_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data.get("prompt", data) if isinstance(data, dict) else None
+
+    def pin(self, prompt):
+        if not point_at(prompt, "")[1]:
+            raise ValueError("The workflow has no Load (Region) from Photoshop node")
+        os.makedirs(os.path.dirname(self.workflow_path) or ".", exist_ok=True)
+        tmp = self.workflow_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"prompt": prompt}, f)
+        os.replace(tmp, self.workflow_path)
+
+    def unpin(self):
+        try:
+            os.remove(self.workflow_path)
+        except FileNotFoundError:
+            pass
+
+    def __call__(self, name, path):
+        with self._lock:
+            self._latest = name
+            self._generation += 1
+            timer = threading.Timer(self.delay, self._fire, (self._generation,))
+        timer.daemon = True
+        timer.start()
+
+    def _fire(self, generation):
+        with self._lock:
+            if generation != self._generation or self._latest is None:
+                return      # superseded by a later arrival
+            name, self._latest = self._latest, None
+        prompt = self.pinned()
+        if prompt is None:
+            return
+        prompt, hits = point_at(prompt, name)
+        if not hits:
+            print("[PhotoshopBridge] Pinned workflow has no Photoshop loader; not queued")
+            return
+        LoadFromPhotoshop.index().invalidate()     # so /prompt validation sees the new name
+        try:
+            prompt_id = queue_prompt(prompt)
+        except Exception as e:
+            print(f"[PhotoshopBridge] Auto-queue for {name} failed: {e}")
+            return
+        print(f"[PhotoshopBridge] Auto-queued {name} ({prompt_id})")
+
+
+_autoqueue = None
+
+
+def get_autoqueue():
+    """The auto-queue listener, or None when PS_BRIDGE_AUTOQUEUE is unset."""
+    return _autoqueue
+
+
+def start_if_enabled():
+    global _autoqueue
+    if NOTIFY:
+        get_watcher().add_listener(notify)
+    if AUTOQUEUE:
+        path = AUTOQUEUE
+        if AUTOQUEUE.lower() in ("1", "true", "yes"):
+            path = os.path.join(LoadFromPhotoshop.bridge_dir(), ".autoqueue.json")
+        _autoqueue = AutoQueue(os.path.expanduser(path))
+        get_watcher().add_listener(_autoqueue)
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+
+def tensor_nbytes(value):
+    """Total storage size of a tensor or a tuple of tensors."""
+    if isinstance(value, (tuple, list)):
+        return sum(tensor_nbytes(v) for v in value)
+    return value.element_size() * value.nelement()
+
+
+class TensorCache:
+    """Process-wide LRU of decoded tensors, bounded by total bytes.
+
+    Entries are keyed by file path and carry a signature (mtime_ns, size);
+    a lookup with a different signature drops the stale entry.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, signature):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                if entry is not None:
+                    self._drop(path)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(path)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, path, signature, value):
+        size = tensor_nbytes(value)
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+            if size > self.max_bytes:
+                return
+            self._entries[path] = (signature, value, size)
+            self._bytes += size
+            self._evict()
+
+    def discard(self, path):
+        with self._lock:
+            if path in self._entries:
+                self._drop(path)
+
+    def set_budget(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _drop(self, path):
+        _, _, size = self._entries.pop(path)
+        self._bytes -= size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
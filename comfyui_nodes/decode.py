@@ -0,0 +1,214 @@
+from PIL import Image
+import numpy as np
+import torch
+
+from ..bridge_sync import rawpix
+from . import metrics
+
+SCALE_8 = np.float32(1 / 255)
+SCALE_16 = np.float32(1 / 65535)
+
+# Modes PIL hands back as 16/32-bit single-channel integers.
+INT_MODES = ('I', 'I;16', 'I;16L', 'I;16B', 'I;16N')
+
+
+def _normalize(src, scale, out):
+    """uint8/uint16/int32 -> float32 in one pass straight into `out`."""
+    np.multiply(src, scale, out=out, dtype=np.float32)
+
+
+def pil_to_tensors(img):
+    """Convert a PIL image to (IMAGE [1,H,W,3], MASK [1,H,W]) float tensors.
+
+    The pixels are read once at their native depth and scaled directly into
+    preallocated contiguous RGB and mask buffers, so there are no float
+    temporaries and no strided views for downstream nodes to copy again.
+    """
+    width, height = img.size
+    image = np.empty((1, height, width, 3), dtype=np.float32)
+    with metrics.stage("convert"):
+        mask = _convert(img, image)
+    return _tensors(image, mask)
+
+
+def array_to_tensors(pixels):
+    """(IMAGE, MASK) straight from [H,W,C] uint8/uint16 pixels, e.g. a mapped .psraw."""
+    height, width = pixels.shape[:2]
+    image = np.empty((1, height, width, 3), dtype=np.float32)
+    with metrics.stage("convert"):
+        mask = _fill(pixels, SCALE_16 if pixels.dtype.itemsize == 2 else SCALE_8, image)
+    return _tensors(image, mask)
+
+
+def _tensors(image, mask):
+    with metrics.stage("tensor"):
+        image_tensor = torch.from_numpy(image)
+        if mask is None:
+            return (image_tensor, torch.zeros(image.shape[:3]))
+        return (image_tensor, torch.from_numpy(mask))
+
+
+def _fill(src, scale, image):
+    """[H,W,C] integer pixels into `image`; returns a new mask when C is 2 or 4."""
+    if src.ndim == 2:
+        src = src[..., None]
+    channels = src.shape[2]
+    _normalize(src[..., :3] if channels >= 3 else src[..., :1], scale, image[0])
+    if channels not in (2, 4):
+        return None
+    mask = np.empty(image.shape[:3], dtype=np.float32)
+    _normalize(src[..., -1], scale, mask[0])
+    return mask
+
+
+def _convert(img, image):
+    """Fill `image` from `img`; returns the float mask, or None without alpha."""
+    if img.mode == 'P' or img.mode == 'PA':
+        img = img.convert('RGBA' if img.mode == 'PA' or 'transparency' in img.info else 'RGB')
+    elif img.mode in ('RGBa', 'La'):
+        img = img.convert('RGBA')
+    elif img.mode not in ('RGB', 'RGBA', 'L', 'LA') + INT_MODES:
+        img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+
+    src = np.asarray(img)
+    if img.mode in INT_MODES:
+        _fill(src, SCALE_16, image)
+        if img.mode == 'I':
+            np.clip(image, 0.0, 1.0, out=image)
+        return None
+    return _fill(src, SCALE_8, image)
+
+
+def fit_size(width, height, max_pixels=0, multiple=1):
+    """Largest size within `max_pixels` (0 = any) with both sides a multiple of `multiple`."""
+    scale = 1.0
+    if max_pixels and width * height > max_pixels:
+        scale = (max_pixels / (width * height)) ** 0.5
+    multiple = max(1, multiple)
+    w = max(multiple, int(width * scale) // multiple * multiple)
+    h = max(multiple, int(height * scale) // multiple * multiple)
+    return w, h
+
+
+def _resample(img, size):
+    """Scale a decoded image to `size`: integer box reduce first, then one exact resize."""
+    if img.mode == 'P' or img.mode == 'PA':
+        img = img.convert('RGBA' if img.mode == 'PA' or 'transparency' in img.info else 'RGB')
+    elif img.mode in INT_MODES and img.mode != 'I':
+        img = img.convert('I')
+    factor = min(img.width // size[0], img.height // size[1])
+    if factor >= 2:
+        img = img.reduce(factor)
+    if img.size != size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    return img
+
+
+def _resample_array(pixels, size):
+    """_resample for [H,W,C] arrays; planes PIL has no multi-channel mode for go one by one.
+
+    The result keeps the source dtype: 16-bit planes come back from PIL as
+    32-bit 'I' and are clipped to range and narrowed again, so callers that
+    scale by itemsize still see uint16.
+    """
+    channels = pixels.shape[2]
+    if pixels.dtype.itemsize == 1 and channels in (1, 3, 4):
+        img = Image.fromarray(pixels if channels > 1 else pixels[..., 0])
+        return np.asarray(_resample(img, size))
+    planes = np.stack([np.asarray(_resample(Image.fromarray(np.ascontiguousarray(pixels[..., c])), size))
+                       for c in range(channels)], axis=-1)
+    if planes.dtype != pixels.dtype:
+        info = np.iinfo(pixels.dtype)
+        planes = np.clip(planes, info.min, info.max).astype(pixels.dtype)
+    return planes
+
+
+def image_size(path):
+    """(width, height) from the file header."""
+    if path.lower().endswith(rawpix.SUFFIX):
+        return rawpix.image_size(path)
+    with Image.open(path) as img:
+        return img.size
+
+
+def decode_raw(path, box=None, max_pixels=0, multiple=1):
+    """Load a .psraw file: mapped (or decompressed) pixels, sliced, scaled only if asked."""
+    with metrics.stage("open"):
+        pixels = rawpix.read(path)
+    if box is not None:
+        pixels = pixels[box[1]:box[3], box[0]:box[2]]
+    height, width = pixels.shape[:2]
+    metrics.observe_image(width, height)
+    if max_pixels or multiple > 1:
+        size = fit_size(width, height, max_pixels, multiple)
+        if size != (width, height):
+            with metrics.stage("reduce"):
+                pixels = _resample_array(pixels, size)
+    return array_to_tensors(pixels)
+
+
+def decode_file(path, box=None, max_pixels=0, multiple=1, page=0):
+    """Decode a file, optionally only the (left, top, right, bottom) box of it.
+
+    With `max_pixels` or `multiple`, the frame is scaled down while still at
+    its native depth (JPEG DCT scaling via draft, then an integer reduce), so
+    only the scaled size is ever allocated as float32. `page` picks a frame of
+    a multi-page file such as a layered TIFF.
+    """
+    if path.lower().endswith(rawpix.SUFFIX):
+        return decode_raw(path, box, max_pixels, multiple)
+    with metrics.stage("open"):
+        img = Image.open(path)
+    with img:
+        if page:
+            img.seek(page)
+        size = None
+        if max_pixels or multiple > 1:
+            width, height = (box[2] - box[0], box[3] - box[1]) if box else img.size
+            size = fit_size(width, height, max_pixels, multiple)
+            if size == (width, height):
+                size = None
+            elif box is None:
+                img.draft(img.mode, size)
+        with metrics.stage("decode"):
+            if box is not None:
+                img = img.crop(box)
+            else:
+                img.load()
+        metrics.observe_image(*img.size)
+        if size is not None:
+            with metrics.stage("reduce"):
+                img = _resample(img, size)
+        return pil_to_tensors(img)
+
+
+def preview_size(width, height, max_side):
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _to_8bit(img):
+    if img.mode in INT_MODES:
+        img = Image.fromarray((np.asarray(img) >> 8).clip(0, 255).astype(np.uint8))
+    if img.mode not in ('L', 'LA', 'RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.mode or 'transparency' in img.info else 'RGB')
+    return img
+
+
+def decode_preview(path, max_side):
+    """8-bit PIL image no larger than `max_side`, for thumbnails.
+
+    Same draft/reduce path as decode_file, but it never leaves integer pixels.
+    """
+    if path.lower().endswith(rawpix.SUFFIX):
+        pixels = rawpix.read(path)
+        height, width, channels = pixels.shape
+        pixels = _resample_array(pixels, preview_size(width, height, max_side))
+        if pixels.dtype.itemsize > 1:
+            pixels = (pixels >> 8).astype(np.uint8)
+        return Image.fromarray(pixels if channels > 1 else pixels[..., 0])
+    with Image.open(path) as img:
+        size = preview_size(*img.size, max_side)
+        img.draft(img.mode, size)
+        img.load()
+        return _to_8bit(_resample(img, size))
@@ -0,0 +1,154 @@
+"""
+Pod half of the tile-delta format: patches a private copy of the decoded
+frame and rewrites the PNG in the background.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from ..bridge_sync import delta as tile_delta
+from ..bridge_sync.hashing import hash_file
+from .encode import save_temp, tensor_to_pil
+from .nodes import TENSOR_CACHE, LoadFromPhotoshop, decode_pool, load_cached
+
+SCALE_8 = np.float32(1 / 255)
+
+
+class DeltaReceiver:
+    """Applies .psdelta payloads to the (IMAGE, MASK) tensors of a bridge file.
+
+    Versions are the sender's content hashes. The id of a file on disk is its
+    own hash until a delta is applied; after that the patched tensors carry
+    the new id and are written back as PNG on the worker pool, then put into
+    the tensor cache under the rewritten file's signature so no decode happens.
+
+    Tensors from the cache may already be held by earlier or running prompts,
+    so they are never patched in place: the first delta patches a clone, and
+    once the writer has taken a frame the next delta clones it again.
+
+    Pending frames remember the (mtime_ns, size) of the file they descend
+    from. If the file changes underneath them (a full upload, an rsync), they
+    are dropped instead of being written over the newer file.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._frames = {}       # name -> (id, (image, mask), has_alpha), not yet on disk
+        self._bases = {}        # name -> (mtime_ns, size) of the file the pending frame patches
+        self._shared = set()    # names whose pending frame the writer may be reading
+        self._file_ids = {}     # name -> ((mtime_ns, size), id)
+        self._writing = set()
+        self._lock = threading.Lock()
+
+    def _drop(self, name):
+        self._frames.pop(name, None)
+        self._bases.pop(name, None)
+        self._shared.discard(name)
+
+    def _current_id(self, name, signature, path):
+        if name in self._frames:
+            if self._bases[name] == signature:
+                return self._frames[name][0]
+            self._drop(name)        # the file was replaced since
+        known = self._file_ids.get(name)
+        if known is None or known[0] != signature:
+            known = self._file_ids[name] = (signature, hash_file(path))
+        return known[1]
+
+    def apply(self, name, payload):
+        header, tiles = tile_delta.decode(payload)
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            try:
+                signature = _signature(path)
+                base_id = self._current_id(name, signature, path)
+            except OSError:
+                raise tile_delta.DeltaMismatch(f"No base for {name}")
+            if base_id != header["base_id"]:
+                raise tile_delta.DeltaMismatch(f"{name} is not at version {header['base_id']}")
+
+            pending = self._frames.get(name)
+            image, mask = pending[1] if pending else load_cached(path)
+            if tuple(image.shape[1:3]) != (header["height"], header["width"]):
+                raise tile_delta.DeltaMismatch(f"{name} changed size")
+            if pending is None or name in self._shared:
+                image, mask = image.clone(), mask.clone()
+            image_np, mask_np = image.numpy(), mask.numpy()
+            for top, bottom, left, right, tile in tiles:
+                np.multiply(tile[..., :3], SCALE_8, out=image_np[0, top:bottom, left:right],
+                            dtype=np.float32)
+                if header["channels"] == 4:
+                    np.multiply(tile[..., 3], SCALE_8, out=mask_np[0, top:bottom, left:right],
+                                dtype=np.float32)
+
+            self._frames[name] = (header["new_id"], (image, mask), header["channels"] == 4)
+            self._bases[name] = signature
+            self._shared.discard(name)
+            if name not in self._writing:
+                self._writing.add(name)
+                decode_pool().submit(self._write, name)
+
+    def replace_with_upload(self, name, partial):
+        """Rename a finished full upload into place and forget pending deltas for it."""
+        with self._lock:
+            os.replace(partial, os.path.join(self.directory, name))
+            self._drop(name)
+            self._file_ids.pop(name, None)
+
+    def _write(self, name):
+        path = os.path.join(self.directory, name)
+        while True:
+            with self._lock:
+                if name not in self._frames:
+                    self._writing.discard(name)
+                    return
+                version, (image, mask), has_alpha = self._frames[name]
+                base = self._bases[name]
+                self._shared.add(name)
+            try:
+                tmp = save_temp(tensor_to_pil(image[0], mask[0] if has_alpha else None), path, "png", 1)
+            except Exception as e:
+                print(f"[PhotoshopBridge] Could not write patched {name}: {e}")
+                with self._lock:
+                    self._writing.discard(name)
+                    self._shared.discard(name)
+                return
+            with self._lock:
+                try:
+                    on_disk = _signature(path)
+                except OSError:
+                    on_disk = None
+                if self._bases.get(name) != base or on_disk != base:
+                    os.remove(tmp)
+                    if self._bases.get(name) == base:
+                        print(f"[PhotoshopBridge] {name} changed on disk; dropped its pending deltas")
+                        self._drop(name)
+                    continue    # a newer frame or a new file: start over
+                os.replace(tmp, path)
+                signature = _signature(path)
+                TENSOR_CACHE.put(path, signature, (image, mask))
+                self._file_ids[name] = (signature, version)
+                self._bases[name] = signature
+                if self._frames[name][0] == version:
+                    self._drop(name)
+                    self._writing.discard(name)
+                    LoadFromPhotoshop.index().invalidate()
+                    return
+            # Another delta landed while encoding; write again.
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+_receiver = None
+
+
+def get_receiver():
+    global _receiver
+    if _receiver is None:
+        _receiver = DeltaReceiver(LoadFromPhotoshop.bridge_dir())
+    return _receiver
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+
+class DirectoryIndex:
+    """Cached listing of a folder as (name, mtime_ns, size), newest first.
+
+    A refresh is skipped entirely within `ttl` seconds of the last one. After
+    that, the folder is rescanned only when its own mtime moved, and files
+    whose inode is unchanged keep their previous stat, so a network volume
+    only pays one stat per new or replaced file. In-place rewrites keep the
+    directory mtime and inode, so every `full_interval` seconds all entries
+    are re-stat'ed regardless.
+    """
+
+    def __init__(self, path, extensions, ttl=2.0, full_interval=30.0):
+        self.path = path
+        self.extensions = tuple(extensions)
+        self.ttl = ttl
+        self.full_interval = full_interval
+        self.version = 0        # bumped whenever the listing changes
+        self._entries = {}      # name -> (inode, mtime_ns, size)
+        self._sorted = []
+        self._dir_mtime = None
+        self._checked = 0.0
+        self._full_scan = 0.0
+        self._lock = threading.Lock()
+
+    def entries(self, limit=None):
+        """[(name, mtime_ns, size)] newest first, refreshed if stale."""
+        with self._lock:
+            self._refresh()
+            return self._sorted[:limit] if limit else list(self._sorted)
+
+    def names(self, limit=None):
+        return [name for name, _, _ in self.entries(limit)]
+
+    def get(self, name):
+        """(mtime_ns, size) of a listed file, or None."""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(name)
+            return entry[1:] if entry else None
+
+    def invalidate(self):
+        """Force the next call to rescan the folder."""
+        with self._lock:
+            self._checked = 0.0
+            self._dir_mtime = None
+
+    def _refresh(self):
+        now = time.monotonic()
+        if now - self._checked < self.ttl:
+            return
+        self._checked = now
+        try:
+            dir_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            if self._entries:
+                self.version += 1
+            self._entries, self._sorted, self._dir_mtime = {}, [], None
+            return
+
+        full = now - self._full_scan >= self.full_interval
+        if dir_mtime == self._dir_mtime and not full:
+            return
+        self._dir_mtime = dir_mtime
+        if full:
+            self._full_scan = now
+
+        entries = {}
+        with os.scandir(self.path) as it:
+            for de in it:
+                if de.name.startswith('.') or not de.name.lower().endswith(self.extensions):
+                    continue
+                old = self._entries.get(de.name)
+                if old is not None and not full and old[0] == de.inode():
+                    entries[de.name] = old
+                    continue
+                try:
+                    if not de.is_file():
+                        continue
+                    st = de.stat()
+                except OSError:
+                    continue
+                entries[de.name] = (de.inode(), st.st_mtime_ns, st.st_size)
+
+        if entries != self._entries:
+            self.version += 1
+        self._entries = entries
+        self._sorted = sorted(((n, e[1], e[2]) for n, e in entries.items()),
+                              key=lambda e: e[1], reverse=True)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path, extensions):
+    """Shared DirectoryIndex for a folder."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = DirectoryIndex(path, extensions)
+        return index
@@ -0,0 +1,59 @@
+import os
+import hashlib
+import tempfile
+
+from PIL import Image
+import torch
+
+# name -> (file extension, PIL format, save kwargs builder)
+FORMATS = {
+    "png": (".png", "PNG", lambda level: {"compress_level": level}),
+    "webp_lossless": (".webp", "WEBP", lambda level: {"lossless": True, "quality": min(100, level * 11),
+                                                      "method": min(6, level * 2 // 3)}),
+    "tiff_raw": (".tif", "TIFF", lambda level: {"compression": None}),
+}
+
+
+def tensor_digest(image, mask=None):
+    """blake2b of a frame's float data (and mask), without converting it."""
+    h = hashlib.blake2b(digest_size=16)
+    for t in (image, mask):
+        if t is None:
+            continue
+        arr = t.detach().cpu().contiguous().numpy()
+        h.update(f"{arr.dtype}{arr.shape}".encode())
+        h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+def tensor_to_pil(image, mask=None):
+    """[H,W,3] float image (+ optional [H,W] alpha mask) -> 8-bit PIL image."""
+    rgb = image.detach().clamp(0, 1).mul(255).round_().to(torch.uint8)
+    if mask is not None and mask.shape == image.shape[:2]:
+        alpha = mask.detach().clamp(0, 1).mul(255).round_().to(torch.uint8)
+        return Image.fromarray(torch.cat([rgb, alpha[..., None]], dim=-1).cpu().numpy(), "RGBA")
+    return Image.fromarray(rgb.cpu().numpy(), "RGB")
+
+
+def save_temp(pil_image, path, fmt, level):
+    """Encode to a unique dot-prefixed temp file next to `path`; returns its path.
+
+    The name never collides with an upload's .<name>.part or with another
+    writer of the same file.
+    """
+    _, pil_format, options = FORMATS[fmt]
+    head, tail = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(dir=head or ".", prefix=f".{tail}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pil_image.save(f, format=pil_format, **options(level))
+        os.chmod(tmp, 0o644)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return tmp
+
+
+def save_atomic(pil_image, path, fmt, level):
+    """Encode to a temp file in the same folder, then rename."""
+    os.replace(save_temp(pil_image, path, fmt, level), path)
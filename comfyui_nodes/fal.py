@@ -0,0 +1,93 @@
+"""
+fal.ai storage uploads over one pooled session.
+
+Bodies are streamed from the file (or from an in-memory PNG for tensors),
+concurrent uploads are capped, and transient failures are retried.
+"""
+
+import io
+import os
+import time
+import mimetypes
+import threading
+import contextlib
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .encode import tensor_to_pil
+
+FAL_UPLOAD_URL = os.environ.get("PS_BRIDGE_FAL_UPLOAD_URL", "https://rest.fal.run/storage/upload")
+MAX_CONCURRENT = int(os.environ.get("PS_BRIDGE_FAL_CONCURRENCY", "4"))
+RETRIES = 3
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(1, MAX_CONCURRENT))
+
+
+def session():
+    """Shared keep-alive session sized for MAX_CONCURRENT connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, MAX_CONCURRENT))
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _post(open_body, filename, api_key, content_type, timeout=60):
+    """POST a body to fal storage; `open_body()` gives a context manager for the body, per attempt.
+
+    A slot is held only while a request is in flight: failed responses are
+    closed and the slot released before the backoff sleep.
+    """
+    headers = {
+        "Authorization": f"Key {api_key}",
+        "Content-Type": content_type,
+        "X-Fal-File-Name": filename,
+    }
+    for attempt in range(RETRIES + 1):
+        with _slots, open_body() as body:
+            try:
+                resp = session().post(FAL_UPLOAD_URL, headers=headers, data=body, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == RETRIES:
+                    raise
+                resp = None
+        if resp is not None and (resp.status_code not in RETRY_STATUSES or attempt == RETRIES):
+            break
+        if resp is not None:
+            resp.close()
+        time.sleep(0.5 * 2 ** attempt)
+
+    if not resp.ok:
+        raise RuntimeError(f"Fal upload failed ({resp.status_code}): {resp.text}")
+    result = resp.json()
+    url = result.get("url") or result.get("file_url") or result.get("cdn_url")
+    if not url:
+        raise RuntimeError(f"No URL in fal response: {result}")
+    return url
+
+
+def upload_file(path, api_key, filename=None):
+    """Stream a file from disk to fal storage and return its URL."""
+    filename = filename or os.path.basename(path)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return _post(lambda: open(path, "rb"), filename, api_key, content_type)
+
+
+def upload_image(image, api_key, filename="image.png"):
+    """PNG-encode an IMAGE frame in memory (no temp file) and upload it."""
+    if image.dim() == 4:
+        image = image[0]
+    buf = io.BytesIO()
+    tensor_to_pil(image).save(buf, format="PNG", compress_level=1)
+
+    def rewound():
+        buf.seek(0)     # every attempt sends the one encoded buffer
+        return contextlib.nullcontext(buf)
+    return _post(rewound, filename, api_key, "image/png")
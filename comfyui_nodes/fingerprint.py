@@ -0,0 +1,59 @@
+import hashlib
+import threading
+
+from PIL import Image
+
+from ..bridge_sync import layered, rawpix
+from ..bridge_sync.hashing import hash_file
+
+
+def hash_pixels(path):
+    """blake2b of the decoded pixels, so re-encodes of the same image match.
+
+    Every page of a multi-page file (a layered TIFF) is hashed, with its
+    description, so a change to any layer or its offset moves the hash.
+    """
+    if path.lower().endswith(rawpix.SUFFIX):
+        pixels = rawpix.read(path)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{pixels.dtype}:{pixels.shape}".encode())
+        h.update(pixels)
+        return h.hexdigest()
+    with Image.open(path) as img:
+        h = hashlib.blake2b(digest_size=16)
+        pages = getattr(img, "n_frames", 1)
+        for page in range(pages):
+            img.seek(page)
+            h.update(f"{img.mode}:{img.size}".encode())
+            if pages > 1:
+                h.update(str(img.tag_v2.get(layered.DESCRIPTION, "")).encode())
+            h.update(img.tobytes())
+        return h.hexdigest()
+
+
+class Fingerprinter:
+    """Memoized content hashes, recomputed only when (mtime_ns, size) moves."""
+
+    MODES = {"bytes": hash_file, "pixels": hash_pixels}
+
+    def __init__(self, mode):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown fingerprint mode: {mode}")
+        self.mode = mode
+        self._hash = self.MODES[mode]
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def fingerprint(self, path, signature):
+        with self._lock:
+            memo = self._memo.get(path)
+        if memo is not None and memo[0] == signature:
+            return memo[1]
+        digest = self._hash(path)
+        with self._lock:
+            self._memo[path] = (signature, digest)
+        return digest
+
+    def forget(self, path):
+        with self._lock:
+            self._memo.pop(path, None)
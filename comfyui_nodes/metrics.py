@@ -0,0 +1,149 @@
+"""
+Stage timings and counters for the loaders, rendered in Prometheus text format.
+
+Timing is off unless PS_BRIDGE_METRICS=1; disabled, `stage()` hands back a
+shared no-op context and the counters are not touched. Gauges registered with
+`add_collector` (cache sizes, hit/miss counts) are read at scrape time and
+are always available.
+"""
+
+import os
+import time
+import bisect
+import threading
+from contextlib import nullcontext
+
+ENABLED = os.environ.get("PS_BRIDGE_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+
+PREFIX = "ps_bridge"
+
+# Seconds; covers a warm cache hit up to a 12K decode off a network volume.
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MEGAPIXEL_BUCKETS = (0.25, 1, 2, 4, 8, 16, 32, 64, 144)
+
+_NULL = nullcontext()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a sum and a count, one series per label."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._series = {}       # label -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label)
+            if series is None:
+                series = self._series[label] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {label: list(series) for label, series in self._series.items()}
+
+
+class Counters:
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, value=1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+
+STAGES = Histogram(TIME_BUCKETS)
+MEGAPIXELS = Histogram(MEGAPIXEL_BUCKETS)
+COUNTERS = Counters()
+_collectors = []
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGES.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def stage(name):
+    """Context manager timing one stage (list, open, decode, convert, tensor, ...)."""
+    return _Stage(name) if ENABLED else _NULL
+
+
+def count(name, value=1):
+    if ENABLED:
+        COUNTERS.add(name, value)
+
+
+def observe_image(width, height):
+    if ENABLED:
+        COUNTERS.add("images_decoded")
+        COUNTERS.add("pixels_decoded", width * height)
+        MEGAPIXELS.observe("decode", width * height / 1e6)
+
+
+def add_collector(fn):
+    """Register fn() -> {metric_name: value}, sampled on every scrape.
+
+    Names ending in _total are exposed as counters, everything else as gauges.
+    """
+    _collectors.append(fn)
+
+
+# ── Exposition ───────────────────────────────────────────────────────────────
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _render_histogram(lines, name, help_text, histogram, label_name):
+    snapshot = histogram.snapshot()
+    if not snapshot:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label, series in sorted(snapshot.items()):
+        cumulative = 0
+        for bound, n in zip(histogram.buckets + ("+Inf",), series[:-1]):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{label_name}="{label}"}} {_format(series[-1])}')
+        lines.append(f'{name}_count{{{label_name}="{label}"}} {cumulative}')
+
+
+def render():
+    """All metrics in Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    _render_histogram(lines, f"{PREFIX}_stage_seconds", "Time spent per loader stage.", STAGES, "stage")
+    _render_histogram(lines, f"{PREFIX}_image_megapixels", "Size of decoded images.", MEGAPIXELS, "op")
+    for name, value in sorted(COUNTERS.snapshot().items()):
+        lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+        lines.append(f"{PREFIX}_{name}_total {_format(value)}")
+    for fn in _collectors:
+        try:
+            values = fn()
+        except Exception as e:
+            print(f"[PhotoshopBridge] Metrics collector failed: {e}")
+            continue
+        for name, value in sorted(values.items()):
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+            lines.append(f"{PREFIX}_{name} {_format(value)}")
+    lines.append(f"# TYPE {PREFIX}_metrics_enabled gauge")
+    lines.append(f"{PREFIX}_metrics_enabled {int(ENABLED)}")
+    return "\n".join(lines) + "\n"
@@ -1,72 +1,734 @@
 import os
+import json
+import time
+import fnmatch
+import tempfile
+import configparser
+from concurrent.futures import ThreadPoolExecutor
 import folder_paths
-from PIL import Image
-import numpy as np
 import torch
+import torch.nn.functional as F
+
+from ..bridge_sync.layered import read_pages
+from . import fal, metrics, tracing
+from .cache import TensorCache
+from .decode import decode_file, image_size
+from .encode import FORMATS, save_atomic, tensor_digest, tensor_to_pil
+from .dirindex import get_index
+from .fingerprint import Fingerprinter
+from .retention import note_loaded
+from .store import get_store, is_stored
+from .url_cache import UrlCache, decode_mapped
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.psraw')
+# Multi-page layered exports, read by Load Layers from Photoshop.
+LAYERED_EXTENSIONS = ('.tif', '.tiff')
+
+# Decoded (IMAGE, MASK) tensors, shared by every loader in the process.
+CACHE_MB = int(os.environ.get("PS_BRIDGE_CACHE_MB", "2048"))
+TENSOR_CACHE = TensorCache(CACHE_MB * 1024 * 1024)
+metrics.add_collector(lambda: {
+    f"tensor_cache_{k}" + ("_total" if k in ("hits", "misses", "evictions") else ""): v
+    for k, v in TENSOR_CACHE.stats().items()
+})
+
+# Show only the newest N files in the combo (0 = all of them).
+LIST_LIMIT = int(os.environ.get("PS_BRIDGE_LIST_LIMIT", "0"))
+
+# IS_CHANGED by content ("bytes" or "pixels") instead of mtime.
+FINGERPRINT_MODE = os.environ.get("PS_BRIDGE_FINGERPRINT", "").strip().lower()
+FINGERPRINTER = Fingerprinter(FINGERPRINT_MODE) if FINGERPRINT_MODE else None
+
+# Disk budget for images downloaded by Load Image from URL.
+URL_CACHE_MB = int(os.environ.get("PS_BRIDGE_URL_CACHE_MB", "1024"))
+_url_cache = None
+
+# Threads for decoding batches and encoding saves; PIL releases the GIL for both.
+DECODE_WORKERS = int(os.environ.get("PS_BRIDGE_DECODE_WORKERS", "4"))
+_decode_pool = None
+
+
+def decode_pool():
+    global _decode_pool
+    if _decode_pool is None:
+        _decode_pool = ThreadPoolExecutor(max_workers=max(1, DECODE_WORKERS),
+                                          thread_name_prefix="ps_bridge_decode")
+    return _decode_pool
+
+
+def load_cached(image_path, box=None, max_pixels=0, multiple=1, page=0):
+    """Decode an image (or a box of it), reusing the tensors if the file is unchanged."""
+    st = os.stat(image_path)
+    signature = (st.st_mtime_ns, st.st_size)
+    key = image_path if box is None else f"{image_path}#{box}"
+    if max_pixels or multiple > 1:
+        key = f"{key}@{max_pixels}/{multiple}"
+    if page:
+        key = f"{key}[{page}]"
+    cached = TENSOR_CACHE.get(key, signature)
+    if cached is not None:
+        return cached
+    metrics.count("bytes_read", st.st_size)
+    result = decode_file(image_path, box, max_pixels, multiple, page)
+    TENSOR_CACHE.put(key, signature, result)
+    return result
+
+
+# name -> (box, max_pixels, multiple) of its last load, so a pre-decode builds
+# the cache entry the graph will ask for; "" holds the last whole-frame sizing.
+_last_loads = {}
+
+
+def note_load_args(name, box=None, max_pixels=0, multiple=1):
+    _last_loads[name] = (box, max_pixels, multiple)
+    if box is None:
+        _last_loads[""] = (None, max_pixels, multiple)
+
+
+def warm_cache(path):
+    """Decode a new arrival the way loaders last read it (that name, else any)."""
+    args = _last_loads.get(os.path.basename(path)) or _last_loads.get("", (None, 0, 1))
+    return load_cached(path, *args)
+
+
+def url_cache():
+    global _url_cache
+    if _url_cache is None:
+        directory = os.path.join(folder_paths.get_input_directory(), ".photoshop_bridge_urls")
+        _url_cache = UrlCache(directory, URL_CACHE_MB * 1024 * 1024)
+    return _url_cache
+
+
+def read_sidecar(image_path, sidecar_path=None):
+    """The region sidecar (<name>.json) written next to a selection export."""
+    try:
+        with open(sidecar_path or os.path.splitext(image_path)[0] + ".json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
 
 
 class LoadFromPhotoshop:
-    """Load an image synced from Photoshop via rsync."""
+    """Load an image synced from Photoshop via rsync.
+
+    max_megapixels / multiple_of shrink huge canvases while decoding, so the
+    full-size float frame never exists; the document size is passed through
+    for scaling results back up.
+
+    Entries starting with "@" come from the content-addressed store: the
+    latest version of that export, or the one pinned by `version`.
+    """
 
     SUBFOLDER = "photoshop_bridge"
 
+    @classmethod
+    def bridge_dir(cls):
+        return os.path.join(folder_paths.get_input_directory(), cls.SUBFOLDER)
+
+    @classmethod
+    def index(cls):
+        return get_index(cls.bridge_dir(), IMAGE_EXTENSIONS + LAYERED_EXTENSIONS)
+
+    @classmethod
+    def store(cls):
+        return get_store(cls.bridge_dir())
+
+    @classmethod
+    def resolve(cls, image, version=0):
+        """Path of a bridge file, or of a stored version for "@name"; None if missing."""
+        if is_stored(image):
+            found = cls.store().resolve(image, version)
+            return found[0] if found else None
+        path = os.path.join(cls.bridge_dir(), image)
+        return path if os.path.exists(path) else None
+
+    @classmethod
+    def entries(cls, limit=None, extensions=IMAGE_EXTENSIONS):
+        """[(name, mtime_ns, size)] as the combo lists them: stored exports, then bridge files."""
+        listed = [e for e in cls.index().entries() if e[0].lower().endswith(extensions)]
+        return cls.store().entries(extensions) + listed[:limit]
+
     @classmethod
     def INPUT_TYPES(cls):
-        input_dir = os.path.join(folder_paths.get_input_directory(), cls.SUBFOLDER)
-        files = []
-        if os.path.isdir(input_dir):
-            files = [f for f in os.listdir(input_dir)
-                     if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
-            files.sort(key=lambda x: os.path.getmtime(
-                os.path.join(input_dir, x)), reverse=True)
+        with metrics.stage("list"):
+            files = [name for name, _, _ in cls.entries(LIST_LIMIT or None)]
         return {
             "required": {
                 "image": (files if files else ["none"],),
+            },
+            "optional": {
+                "max_megapixels": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 1024.0, "step": 0.25}),
+                "multiple_of": ("INT", {"default": 1, "min": 1, "max": 256}),
+                "version": ("INT", {"default": 0, "min": 0, "max": 1000000}),
             }
         }
 
-    RETURN_TYPES = ("IMAGE", "MASK")
+    RETURN_TYPES = ("IMAGE", "MASK", "INT", "INT")
+    RETURN_NAMES = ("image", "mask", "original_width", "original_height")
     FUNCTION = "load_image"
     CATEGORY = "PhotoshopBridge"
 
-    def load_image(self, image):
-        input_dir = os.path.join(folder_paths.get_input_directory(), self.SUBFOLDER)
-        image_path = os.path.join(input_dir, image)
+    def load_image(self, image, max_megapixels=0.0, multiple_of=1, version=0):
+        image_path = self.resolve(image, version)
+        if image_path is None:
+            blank = torch.zeros((1, 64, 64, 3))
+            mask = torch.zeros((1, 64, 64))
+            return (blank, mask, 64, 64)
+
+        note_loaded(os.path.relpath(image_path, self.bridge_dir()))
+        max_pixels = int(max_megapixels * 1e6)
+        if not is_stored(image):
+            note_load_args(image, None, max_pixels, multiple_of)
+        started = time.time()
+        with metrics.stage("load"):
+            image_tensor, mask = load_cached(image_path, None, max_pixels, multiple_of)
+        if tracing.ENABLED and (not is_stored(image) or version == 0):
+            tracing.get_trace_log(self.bridge_dir()).record(image.lstrip("@"), image_path, started, time.time())
+        if max_pixels or multiple_of > 1:
+            width, height = image_size(image_path)
+        else:
+            height, width = image_tensor.shape[1:3]
+        return (image_tensor, mask, width, height)
+
+    @classmethod
+    def IS_CHANGED(cls, image, version=0, **kwargs):
+        if is_stored(image):
+            found = cls.store().resolve(image, version)
+            return found[2]["hash"] if found else float("inf")
+        image_path = os.path.join(cls.bridge_dir(), image)
         if not os.path.exists(image_path):
+            return float("inf")
+        if FINGERPRINTER is None:
+            return os.path.getmtime(image_path)
+        st = os.stat(image_path)
+        return FINGERPRINTER.fingerprint(image_path, (st.st_mtime_ns, st.st_size))
+
+
+class LoadRegionFromPhotoshop(LoadFromPhotoshop):
+    """Load a selection export (or a crop of any export) with its canvas offsets.
+
+    Offsets come from the sidecar the plugin writes for "Selection only"
+    exports. A width/height > 0 additionally crops to that canvas-space box,
+    and only the box is converted to float.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        types = super().INPUT_TYPES()
+        types["optional"] = {
+            "x": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "y": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "width": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "height": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "version": ("INT", {"default": 0, "min": 0, "max": 1000000}),
+        }
+        return types
+
+    RETURN_TYPES = ("IMAGE", "MASK", "INT", "INT", "INT", "INT")
+    RETURN_NAMES = ("image", "mask", "x", "y", "canvas_width", "canvas_height")
+    FUNCTION = "load_region"
+
+    def load_region(self, image, x=0, y=0, width=0, height=0, version=0):
+        image_path = self.resolve(image, version)
+        if image_path is None:
+            blank = torch.zeros((1, 64, 64, 3))
+            mask = torch.zeros((1, 64, 64))
+            return (blank, mask, 0, 0, 64, 64)
+
+        note_loaded(os.path.relpath(image_path, self.bridge_dir()))
+        if is_stored(image):
+            number = self.store().resolve(image, version)[1]
+            sidecar_path = self.store().sidecar_path(image, number)
+            sidecar = read_sidecar(image_path, sidecar_path) if sidecar_path else None
+        else:
+            sidecar = read_sidecar(image_path)
+        sidecar = sidecar or {}
+        file_w, file_h = image_size(image_path)
+        left, top = int(sidecar.get("left", 0)), int(sidecar.get("top", 0))
+        canvas_w = int(sidecar.get("canvas_width", file_w))
+        canvas_h = int(sidecar.get("canvas_height", file_h))
+
+        box = None
+        if width > 0 and height > 0:
+            box = (max(0, x - left), max(0, y - top),
+                   min(file_w, x - left + width), min(file_h, y - top + height))
+            if box[0] >= box[2] or box[1] >= box[3]:
+                raise ValueError(f"Region {x},{y} {width}x{height} is outside {image}")
+            left, top = left + box[0], top + box[1]
+
+        if not is_stored(image):
+            note_load_args(image, box)
+        image_tensor, mask = load_cached(image_path, box)
+        return (image_tensor, mask, left, top, canvas_w, canvas_h)
+
+    @classmethod
+    def IS_CHANGED(cls, image, version=0, **kwargs):
+        if is_stored(image):
+            found = cls.store().resolve(image, version)
+            sidecar = found and cls.store().sidecar_path(image, found[1])
+        else:
+            sidecar = os.path.splitext(os.path.join(cls.bridge_dir(), image))[0] + ".json"
+        sidecar_mtime = os.path.getmtime(sidecar) if sidecar and os.path.exists(sidecar) else 0
+        return f"{LoadFromPhotoshop.IS_CHANGED(image, version)}:{sidecar_mtime}"
+
+
+def _fit_batch(frames, policy):
+    """Stack [1,H,W,C] / [1,H,W] pairs of mixed sizes into one batch."""
+    sizes = [image.shape[1:3] for image, _ in frames]
+    if policy == "pad":
+        height, width = max(h for h, _ in sizes), max(w for _, w in sizes)
+    elif policy == "crop":
+        height, width = min(h for h, _ in sizes), min(w for _, w in sizes)
+    else:
+        height, width = sizes[0]
+
+    images = torch.zeros((len(frames), height, width, 3))
+    masks = torch.zeros((len(frames), height, width))
+    for i, (image, mask) in enumerate(frames):
+        h, w = image.shape[1:3]
+        if policy == "resize" and (h, w) != (height, width):
+            image = F.interpolate(image.movedim(-1, 1), size=(height, width),
+                                  mode="bilinear", align_corners=False).movedim(1, -1)
+            mask = F.interpolate(mask[:, None], size=(height, width),
+                                 mode="bilinear", align_corners=False)[:, 0]
+            h, w = height, width
+        top, left = (h - height) // 2, (w - width) // 2
+        if policy == "crop":
+            images[i] = image[0, top:top + height, left:left + width]
+            masks[i] = mask[0, top:top + height, left:left + width]
+        else:
+            images[i, :h, :w] = image[0]
+            masks[i, :h, :w] = mask[0]
+    return images, masks
+
+
+class LoadBatchFromPhotoshop:
+    """Load several bridge files as one IMAGE/MASK batch, decoded in parallel."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "selection": (["newest", "glob", "list"],),
+                "pattern": ("STRING", {"default": "*.png", "multiline": True}),
+                "count": ("INT", {"default": 8, "min": 1, "max": 256}),
+                "size_policy": (["pad", "crop", "resize"],),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK")
+    FUNCTION = "load_batch"
+    CATEGORY = "PhotoshopBridge"
+
+    @classmethod
+    def select_files(cls, selection, pattern, count):
+        names = [n for n in LoadFromPhotoshop.index().names() if n.lower().endswith(IMAGE_EXTENSIONS)]
+        if selection == "list":
+            wanted = [n.strip() for n in pattern.replace(",", "\n").splitlines() if n.strip()]
+            listed = set(names)
+            return [n for n in wanted if n in listed][:count]
+        if selection == "glob":
+            names = [n for n in names if fnmatch.fnmatch(n, pattern.strip())]
+        return names[:count]
+
+    def load_batch(self, selection, pattern, count, size_policy):
+        input_dir = LoadFromPhotoshop.bridge_dir()
+        files = self.select_files(selection, pattern, count)
+        if not files:
             blank = torch.zeros((1, 64, 64, 3))
             mask = torch.zeros((1, 64, 64))
             return (blank, mask)
 
-        img = Image.open(image_path)
-        if img.mode == 'I':
-            img = img.point(lambda i: i * (1 / 255))
-        has_alpha = img.mode == 'RGBA'
-        if img.mode not in ('RGB', 'RGBA'):
-            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
-
-        img_array = np.array(img).astype(np.float32) / 255.0
-        if has_alpha:
-            image_tensor = torch.from_numpy(img_array[:, :, :3])[None,]
-            mask = torch.from_numpy(img_array[:, :, 3])[None,]
+        for f in files:
+            note_loaded(f)
+            note_load_args(f)
+        paths = [os.path.join(input_dir, f) for f in files]
+        frames = list(decode_pool().map(load_cached, paths))
+        return _fit_batch(frames, size_policy)
+
+    @classmethod
+    def IS_CHANGED(cls, selection, pattern, count, size_policy):
+        index = LoadFromPhotoshop.index()
+        return str([(f, index.get(f)) for f in cls.select_files(selection, pattern, count)])
+
+
+_page_tables = {}      # path -> ((mtime_ns, size), (canvas, pages))
+
+
+def page_table(path):
+    """Canvas size and pages of a layered export, re-read only when the file changes."""
+    st = os.stat(path)
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _page_tables.get(path)
+    if cached is None or cached[0] != signature:
+        cached = _page_tables[path] = (signature, read_pages(path))
+    return cached[1]
+
+
+def select_pages(pages, layers):
+    """Page indexes for comma/newline separated layer names, globs or 1-based numbers."""
+    selected = []
+    for token in [t.strip() for t in layers.replace(",", "\n").splitlines() if t.strip()] or ["*"]:
+        if token.isdigit():
+            matches = [int(token) - 1] if 1 <= int(token) <= len(pages) else []
         else:
-            image_tensor = torch.from_numpy(img_array)[None,]
-            mask = torch.zeros((1, img_array.shape[0], img_array.shape[1]))
+            matches = [i for i, page in enumerate(pages) if fnmatch.fnmatchcase(page["name"], token)]
+        selected += [i for i in matches if i not in selected]
+    return selected
+
 
-        return (image_tensor, mask)
+def _place_on_canvas(frames, pages, canvas):
+    """Batch of full-canvas frames, each layer at its offset and transparent elsewhere."""
+    width, height = canvas
+    images = torch.zeros((len(frames), height, width, 3))
+    masks = torch.zeros((len(frames), height, width))
+    for i, ((image, mask), page) in enumerate(zip(frames, pages)):
+        left, top = page["left"], page["top"]
+        x0, y0 = max(0, left), max(0, top)
+        x1, y1 = min(width, left + image.shape[2]), min(height, top + image.shape[1])
+        if x0 >= x1 or y0 >= y1:
+            continue
+        images[i, y0:y1, x0:x1] = image[0, y0 - top:y1 - top, x0 - left:x1 - left]
+        masks[i, y0:y1, x0:x1] = mask[0, y0 - top:y1 - top, x0 - left:x1 - left]
+    return images, masks
+
+
+class LoadLayersFromPhotoshop(LoadFromPhotoshop):
+    """Load chosen layers of a layered export (one multi-page TIFF) as a batch.
+
+    The layer list comes from the TIFF directory alone and only the selected
+    pages are decoded, in parallel. "canvas" places every layer at its offset
+    on the full document; the other policies stack the layers at their own
+    bounds like Load Batch from Photoshop.
+    """
 
     @classmethod
-    def IS_CHANGED(cls, image):
-        input_dir = os.path.join(folder_paths.get_input_directory(), cls.SUBFOLDER)
-        image_path = os.path.join(input_dir, image)
-        if os.path.exists(image_path):
-            return os.path.getmtime(image_path)
-        return float("inf")
+    def INPUT_TYPES(cls):
+        with metrics.stage("list"):
+            files = [name for name, _, _ in cls.entries(LIST_LIMIT or None, LAYERED_EXTENSIONS)]
+        return {
+            "required": {
+                "image": (files if files else ["none"],),
+                "layers": ("STRING", {"default": "*", "multiline": True}),
+                "placement": (["canvas", "pad", "crop", "resize"],),
+            },
+            "optional": {
+                "version": ("INT", {"default": 0, "min": 0, "max": 1000000}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK", "STRING", "INT", "INT")
+    RETURN_NAMES = ("image", "mask", "layer_names", "canvas_width", "canvas_height")
+    FUNCTION = "load_layers"
+
+    def load_layers(self, image, layers="*", placement="canvas", version=0):
+        image_path = self.resolve(image, version)
+        if image_path is None:
+            blank = torch.zeros((1, 64, 64, 3))
+            mask = torch.zeros((1, 64, 64))
+            return (blank, mask, "", 64, 64)
+
+        note_loaded(os.path.relpath(image_path, self.bridge_dir()))
+        canvas, pages = page_table(image_path)
+        selected = select_pages(pages, layers)
+        if not selected:
+            names = ", ".join(page["name"] for page in pages)
+            raise ValueError(f"No layer of {image} matches {layers!r} (layers: {names})")
+        with metrics.stage("load"):
+            frames = list(decode_pool().map(lambda i: load_cached(image_path, page=i), selected))
+        if placement == "canvas":
+            images, masks = _place_on_canvas(frames, [pages[i] for i in selected], canvas)
+        else:
+            images, masks = _fit_batch(frames, placement)
+        names = "\n".join(pages[i]["name"] for i in selected)
+        return (images, masks, names, canvas[0], canvas[1])
+
+
+class SaveImageToPhotoshop:
+    """Save results into an outbox folder that the sync agent pulls back to the Mac.
+
+    Frames are encoded concurrently on the worker pool and written atomically.
+    A frame whose tensor content matches the last save to the same path, in
+    the same format and compression level, is not re-encoded.
+    """
+
+    SUBFOLDER = "photoshop_bridge"
+
+    # (path, format, compression) -> tensor digest of the last frame written there
+    _last_saved = {}
+
+    @classmethod
+    def outbox_dir(cls):
+        return os.path.join(folder_paths.get_output_directory(), cls.SUBFOLDER)
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "images": ("IMAGE",),
+                "filename_prefix": ("STRING", {"default": "comfy"}),
+                "format": (list(FORMATS),),
+                "compression": ("INT", {"default": 1, "min": 0, "max": 9}),
+            },
+            "optional": {
+                "mask": ("MASK",),
+            }
+        }
+
+    RETURN_TYPES = ()
+    FUNCTION = "save_images"
+    OUTPUT_NODE = True
+    CATEGORY = "PhotoshopBridge"
+
+    def _save_one(self, image, mask, path, fmt, compression):
+        name = os.path.basename(path)
+        key = (path, fmt, compression)
+        digest = tensor_digest(image, mask)
+        if self._last_saved.get(key) == digest and os.path.exists(path):
+            return name
+        save_atomic(tensor_to_pil(image, mask), path, fmt, compression)
+        self._last_saved[key] = digest
+        return name
+
+    def save_images(self, images, filename_prefix="comfy", format="png", compression=1, mask=None):
+        outbox = self.outbox_dir()
+        os.makedirs(outbox, exist_ok=True)
+        ext = FORMATS[format][0]
+        prefix = os.path.basename(filename_prefix.strip()) or "comfy"
+
+        jobs = []
+        for idx, image in enumerate(images):
+            frame_mask = None
+            if mask is not None:
+                frame_mask = mask[min(idx, mask.shape[0] - 1)] if mask.dim() == 3 else mask
+            path = os.path.join(outbox, f"{prefix}_{idx:04d}{ext}")
+            jobs.append(decode_pool().submit(self._save_one, image, frame_mask, path, format, compression))
+
+        results = [{"filename": job.result(), "subfolder": self.SUBFOLDER, "type": "output"}
+                   for job in jobs]
+        return {"ui": {"images": results}}
+
+
+class SaveRegionToPhotoshop(SaveImageToPhotoshop):
+    """Save results for a region, ready to be placed back at its offset.
+
+    With a background the region is composited into it (through the mask, if
+    given) and the full canvas is saved; otherwise the region is saved as is.
+    Each file gets a <name>.json sidecar with the offset and canvas size.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        types = super().INPUT_TYPES()
+        types["required"].update({
+            "x": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "y": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "canvas_width": ("INT", {"default": 0, "min": 0, "max": 65536}),
+            "canvas_height": ("INT", {"default": 0, "min": 0, "max": 65536}),
+        })
+        types["optional"]["background"] = ("IMAGE",)
+        return types
+
+    RETURN_TYPES = ("IMAGE",)
+    FUNCTION = "save_region"
+
+    @staticmethod
+    def composite(images, background, x, y, mask=None):
+        """Images pasted at (x, y) onto copies of the background.
+
+        A background batch shorter than `images` is cycled, so frame i lands
+        on background frame i % len(background).
+        """
+        count = images.shape[0]
+        out = background.repeat(-(-count // background.shape[0]), 1, 1, 1)[:count]
+        h = min(images.shape[1], out.shape[1] - y)
+        w = min(images.shape[2], out.shape[2] - x)
+        if h <= 0 or w <= 0:
+            return out
+        region = images[:, :h, :w]
+        if mask is not None:
+            alpha = (mask if mask.dim() == 3 else mask[None])[:, :h, :w, None]
+            region = out[:, y:y + h, x:x + w] * (1 - alpha) + region * alpha
+        out[:, y:y + h, x:x + w] = region
+        return out
+
+    def save_region(self, images, filename_prefix, format, compression, x, y,
+                    canvas_width, canvas_height, mask=None, background=None):
+        if background is not None:
+            images = self.composite(images, background, x, y, mask)
+            mask, x, y = None, 0, 0
+            canvas_height, canvas_width = images.shape[1:3]
+        saved = self.save_images(images, filename_prefix, format, compression, mask)
+
+        outbox = self.outbox_dir()
+        for item in saved["ui"]["images"]:
+            frame_h, frame_w = images.shape[1:3]
+            sidecar = {
+                "canvas_width": canvas_width or frame_w,
+                "canvas_height": canvas_height or frame_h,
+                "left": x, "top": y, "width": frame_w, "height": frame_h,
+            }
+            path = os.path.join(outbox, os.path.splitext(item["filename"])[0] + ".json")
+            tmp = os.path.join(outbox, f".{os.path.basename(path)}.part")
+            with open(tmp, "w") as f:
+                json.dump(sidecar, f)
+            os.replace(tmp, path)
+        return {"ui": saved["ui"], "result": (images,)}
+
+
+class LoadImageFromURL:
+    """
+    Load an image from a URL (e.g. fal.ai storage).
+    Paste the URL the Photoshop plugin gives you after uploading.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "url": ("STRING", {"default": "", "multiline": False}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "MASK")
+    FUNCTION = "load_from_url"
+    CATEGORY = "PhotoshopBridge"
+
+    def load_from_url(self, url):
+        url = url.strip()
+        if not url:
+            blank = torch.zeros((1, 64, 64, 3))
+            mask = torch.zeros((1, 64, 64))
+            return (blank, mask)
+        with url_cache().reading(url) as (body_path, _):
+            st = os.stat(body_path)
+            signature = (st.st_mtime_ns, st.st_size)
+            cached = TENSOR_CACHE.get(body_path, signature)
+            if cached is not None:
+                return cached
+            result = decode_mapped(body_path)
+        TENSOR_CACHE.put(body_path, signature, result)
+        return result
+
+    @classmethod
+    def IS_CHANGED(cls, url):
+        url = url.strip()
+        if not url:
+            return ""
+        try:
+            _, meta = url_cache().fetch(url)
+        except Exception:
+            return float("nan")
+        return f"{url}|{meta.get('etag')}|{meta.get('last_modified')}|{meta.get('size')}"
+
+
+class FalImageUpload:
+    """
+    Upload an image to fal.ai storage and return the URL.
+    Accepts any input type: file path, URL, IMAGE tensor, or object with save_to().
+    """
+
+    CATEGORY = "PhotoshopBridge"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "image_path": ("*",),
+            },
+            "optional": {
+                "fal_api_key": ("STRING", {"default": "", "multiline": False}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("image_url",)
+    FUNCTION = "upload"
+
+    def _load_config(self, api_key_override=None):
+        if api_key_override and api_key_override.strip():
+            return api_key_override.strip()
+        if os.environ.get("FAL_KEY"):
+            return os.environ["FAL_KEY"].strip()
+        cfg = configparser.ConfigParser()
+        cfg.read(os.path.join(os.path.dirname(__file__), "config.ini"))
+        api_key = cfg["FAL"].get("API_KEY", "").strip() if "FAL" in cfg else ""
+        if not api_key:
+            raise RuntimeError("Fal.ai API Key not found (FAL_KEY or config.ini [FAL] API_KEY)")
+        return api_key
+
+    def upload(self, image_path, fal_api_key=None):
+        api_key = self._load_config(fal_api_key)
+
+        if isinstance(image_path, list):
+            image_path = image_path[0] if image_path else ""
+
+        # IMAGE tensor: encode in memory, no temp file
+        if isinstance(image_path, torch.Tensor):
+            try:
+                url = fal.upload_image(image_path, api_key)
+                print(f"[PhotoshopBridge Fal] Upload Success: {url}")
+                return (url,)
+            except Exception as e:
+                print(f"[PhotoshopBridge Fal] Upload failed: {e}")
+                return (f"Error: {e}",)
+
+        temp_path = None
+        try:
+            if not isinstance(image_path, str):
+                if hasattr(image_path, "save_to") and callable(image_path.save_to):
+                    fd, temp_path = tempfile.mkstemp(suffix=".png")
+                    os.close(fd)
+                    image_path.save_to(temp_path)
+                    image_path = temp_path
+                else:
+                    for attr in ['path', 'file_path', 'filename', 'url']:
+                        val = getattr(image_path, attr, None)
+                        if val and isinstance(val, str):
+                            image_path = val
+                            break
+                    else:
+                        image_path = str(image_path)
+
+            if not image_path:
+                return ("",)
+            # Already a URL — pass through
+            if image_path.startswith("http"):
+                return (image_path,)
+            if not os.path.exists(image_path):
+                print(f"[PhotoshopBridge Fal] File not found: {image_path}")
+                return ("",)
+
+            print(f"[PhotoshopBridge Fal] Uploading {image_path}...")
+            url = fal.upload_file(image_path, api_key)
+            print(f"[PhotoshopBridge Fal] Upload Success: {url}")
+            return (url,)
+        except Exception as e:
+            print(f"[PhotoshopBridge Fal] Upload failed: {e}")
+            return (f"Error: {e}",)
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
 
 
 NODE_CLASS_MAPPINGS = {
     "LoadFromPhotoshop": LoadFromPhotoshop,
+    "LoadBatchFromPhotoshop": LoadBatchFromPhotoshop,
+    "SaveImageToPhotoshop": SaveImageToPhotoshop,
+    "LoadRegionFromPhotoshop": LoadRegionFromPhotoshop,
+    "LoadLayersFromPhotoshop": LoadLayersFromPhotoshop,
+    "SaveRegionToPhotoshop": SaveRegionToPhotoshop,
+    "LoadImageFromURL": LoadImageFromURL,
+    "FalImageUpload": FalImageUpload,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "LoadFromPhotoshop": "Load from Photoshop",
+    "LoadBatchFromPhotoshop": "Load Batch from Photoshop",
+    "SaveImageToPhotoshop": "Save Image to Photoshop",
+    "LoadRegionFromPhotoshop": "Load Region from Photoshop",
+    "LoadLayersFromPhotoshop": "Load Layers from Photoshop",
+    "SaveRegionToPhotoshop": "Save Region to Photoshop",
+    "LoadImageFromURL": "Load Image from URL (Photoshop Bridge)",
+    "FalImageUpload": "Fal Image Upload (Photoshop Bridge)",
 }
@@ -0,0 +1,171 @@
+"""
+Pod-side retention for the bridge folder: age limit and byte quota, evicting
+the least recently loaded files first and never a file a queued prompt uses.
+
+Export store objects count too, under "store/<object>": those only older
+versions use are evicted like files and marked in manifest.json, objects of
+latest versions are kept, and objects no manifest names are pruned.
+"""
+
+import os
+import threading
+import time
+
+from ..bridge_sync.retention import RetentionIndex, delete_files
+from ..bridge_sync.store import STORE_DIR
+from .store import PREFIX, get_store, is_stored
+
+MAX_AGE_DAYS = float(os.environ.get("PS_BRIDGE_MAX_AGE_DAYS", "0"))
+QUOTA_GB = float(os.environ.get("PS_BRIDGE_QUOTA_GB", "0"))
+SWEEP_INTERVAL = 60.0
+
+RETENTION = None
+
+
+def queued_references(store=None):
+    """Every bridge file a running or pending prompt may load.
+
+    Literal names count as they are. Batch loaders add the files their
+    selection (glob or newest N) picks right now, and "@name" inputs add
+    the store objects of the pinned version, or of every version when the
+    version comes from a link.
+    """
+    try:
+        from server import PromptServer
+        running, pending = PromptServer.instance.prompt_queue.get_current_queue()
+    except Exception:
+        return set()
+    from .nodes import NODE_CLASS_MAPPINGS
+    refs = set()
+    for item in list(running) + list(pending):
+        for node in item[2].values():
+            inputs = node.get("inputs", {})
+            for value in inputs.values():
+                if isinstance(value, str):
+                    for line in value.replace(",", "\n").splitlines():
+                        refs.add(os.path.basename(line.strip()))
+            node_class = NODE_CLASS_MAPPINGS.get(node.get("class_type"))
+            if hasattr(node_class, "select_files"):
+                refs.update(_selected_files(node_class, inputs))
+            image = inputs.get("image")
+            if store is not None and isinstance(image, str) and is_stored(image):
+                refs.update(_stored_objects(store, image, inputs.get("version", 0)))
+    return refs
+
+
+def _selected_files(node_class, inputs):
+    try:
+        return node_class.select_files(inputs["selection"], inputs["pattern"], inputs["count"])
+    except Exception:
+        return []       # linked or missing inputs
+
+
+def _stored_objects(store, image, version):
+    """store/<object> keys for "@name" at `version`, with their sidecars."""
+    name = image[len(PREFIX):]
+    versions = store.manifest().names.get(name, [])
+    numbers = [version] if isinstance(version, int) else range(1, len(versions) + 1)
+    keys = set()
+    for number in numbers:
+        found = store.resolve(image, number)
+        if found is None:
+            continue
+        keys.add(os.path.join(STORE_DIR, found[2]["file"]))
+        sidecar = store.sidecar_path(image, found[1])
+        if sidecar:
+            keys.add(os.path.join(STORE_DIR, os.path.basename(sidecar)))
+    return keys
+
+
+class PodRetention(threading.Thread):
+    """Periodically reconciles with the directory index and deletes old files.
+
+    The index is only re-read when its listing version moved, so a sweep with
+    no arrivals and nothing to evict costs a few dictionary lookups.
+    """
+
+    def __init__(self, directory, index, cache, max_age_days, quota_bytes):
+        super().__init__(name="ps_bridge_retention", daemon=True)
+        self.directory = directory
+        self.index = index
+        self.cache = cache
+        self.store = get_store(directory)
+        self.retention = RetentionIndex(max_age_days, quota_bytes,
+                                        os.path.join(directory, ".retention.json"))
+        self._known = {}
+        self._early = {}        # loads of files the index has not listed yet
+        self._version = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def note_loaded(self, name):
+        with self._lock:
+            if name in self.retention:
+                self.retention.touch(name)
+            else:
+                self._early[name] = time.time()
+
+    def _store_entries(self):
+        return {os.path.join(STORE_DIR, file): (int(last_used * 1e9), size)
+                for file, (size, last_used) in self.store.retention_entries().items()}
+
+    def sweep(self):
+        entries = self.index.entries()
+        version = (self.index.version, self.store.version)
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                current = {name: (mtime_ns, size) for name, mtime_ns, size in entries}
+                current.update(self._store_entries())
+                for name, signature in current.items():
+                    if self._known.get(name) != signature:
+                        self.retention.update(name, signature[1], signature[0] / 1e9)
+                for name in (self._known.keys() or self.retention.names()) - current.keys():
+                    self.retention.remove(name)
+                self._known = current
+                for name, when in self._early.items():
+                    self.retention.touch(name, when)
+                self._early.clear()
+            evicted = self.retention.enforce(protected=queued_references(self.store))
+            for name in evicted:
+                self._known.pop(name, None)
+            self.retention.save()
+        prefix = STORE_DIR + os.sep
+        objects = [name[len(prefix):] for name in evicted if name.startswith(prefix)]
+        files = [name for name in evicted if not name.startswith(prefix)]
+        if objects:
+            self.store.evict(objects)
+        if files:
+            delete_files(self.directory, files)
+            self.index.invalidate()
+        for name in evicted:
+            self.cache.discard(os.path.join(self.directory, name))
+        orphans = self.store.prune_orphans()
+        if evicted or orphans:
+            print(f"[PhotoshopBridge] Retention removed {len(evicted) + len(orphans)} file(s)")
+        return evicted
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(SWEEP_INTERVAL):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[PhotoshopBridge] Retention sweep failed: {e}")
+
+
+def note_loaded(name):
+    if RETENTION is not None:
+        RETENTION.note_loaded(name)
+
+
+def start_if_enabled(directory, index, cache):
+    global RETENTION
+    if RETENTION is None and (MAX_AGE_DAYS or QUOTA_GB):
+        os.makedirs(directory, exist_ok=True)
+        RETENTION = PodRetention(directory, index, cache, MAX_AGE_DAYS,
+                                 int(QUOTA_GB * 1024 ** 3))
+        RETENTION.start()
+    return RETENTION
@@ -0,0 +1,345 @@
+"""
+HTTP routes on the ComfyUI server: direct upload into the bridge folder,
+tile-delta updates of files already there, the auto-queue pin, metrics and
+latency traces, and the paginated listing and thumbnails behind the file picker.
+"""
+
+import os
+import asyncio
+import fnmatch
+from urllib.parse import quote
+
+import folder_paths
+
+from ..bridge_sync.delta import DeltaMismatch
+from ..bridge_sync.store import STORE_DIR
+from . import autoqueue, fal, metrics, thumbs
+from .delta_receiver import get_receiver
+from .nodes import IMAGE_EXTENSIONS, LAYERED_EXTENSIONS, LoadFromPhotoshop, decode_pool, warm_cache
+from .store import PREFIX, is_stored
+from .tracing import get_trace_log
+
+CHUNK_SIZE = 1024 * 1024
+
+# .json: region sidecars that travel with selection exports
+UPLOAD_EXTENSIONS = IMAGE_EXTENSIONS + LAYERED_EXTENSIONS + ('.json',)
+
+
+def _bridge_path(name, extensions=UPLOAD_EXTENSIONS, subdir=""):
+    """Validated absolute path for an upload name, or None.
+
+    The only subfolder allowed is the export store.
+    """
+    name = os.path.basename(name or "")
+    if not name or name.startswith(".") or not name.lower().endswith(extensions):
+        return None
+    if subdir not in ("", STORE_DIR):
+        return None
+    return os.path.join(LoadFromPhotoshop.bridge_dir(), subdir, name)
+
+
+def _partial_path(path):
+    head, tail = os.path.split(path)
+    return os.path.join(head, f".{tail}.part")
+
+
+def _partial_size(path):
+    try:
+        return os.path.getsize(_partial_path(path))
+    except OSError:
+        return 0
+
+
+def _finish(path):
+    """Move a complete upload into place; pending deltas for that file are dropped."""
+    partial = _partial_path(path)
+    with open(partial, "rb+") as f:
+        os.fsync(f.fileno())
+    receiver = get_receiver()
+    if os.path.dirname(path) == receiver.directory:
+        receiver.replace_with_upload(os.path.basename(path), partial)
+    else:
+        os.replace(partial, path)
+    LoadFromPhotoshop.index().invalidate()
+
+
+def _warm(path):
+    """Pre-decode an upload on the worker pool; failures (e.g. a corrupt file) are logged."""
+    def done(future):
+        error = future.exception()
+        if error is not None:
+            print(f"[PhotoshopBridge] Could not decode {os.path.basename(path)}: {error}")
+    decode_pool().submit(warm_cache, path).add_done_callback(done)
+
+
+def _thumb_source(name, version=0):
+    """(path, mtime_ns, size, v) of a listed file or stored version, or None.
+
+    `v` is the token /files puts in thumb URLs: the content hash of a stored
+    version (its manifest time is not the object's mtime), else the mtime_ns.
+    """
+    if is_stored(name):
+        found = LoadFromPhotoshop.store().resolve(name, version)
+        if found is None or not os.path.exists(found[0]):
+            return None
+        path, _, entry = found
+        st = os.stat(path)
+        return path, st.st_mtime_ns, st.st_size, entry["hash"]
+    if not name or os.path.basename(name) != name:
+        return None
+    found = LoadFromPhotoshop.index().get(name)
+    if not found:
+        return None
+    return (os.path.join(LoadFromPhotoshop.bridge_dir(), name), *found, str(found[0]))
+
+
+def _listing():
+    """LoadFromPhotoshop.entries() as (name, mtime_ns, size, v), `v` as in _thumb_source."""
+    entries = LoadFromPhotoshop.entries()
+    stored = LoadFromPhotoshop.store().manifest().names
+    listing = []
+    for name, mtime_ns, size in entries:
+        versions = stored.get(name[len(PREFIX):]) if is_stored(name) else None
+        listing.append((name, mtime_ns, size, versions[-1]["hash"] if versions else str(mtime_ns)))
+    return listing
+
+
+def _thumb_px(value):
+    """Requested size snapped up to one of the cached sizes."""
+    try:
+        want = int(value) if value else thumbs.DEFAULT_SIZE
+    except ValueError:
+        want = thumbs.DEFAULT_SIZE
+    return next((px for px in thumbs.SIZES if px >= want), thumbs.SIZES[-1])
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+try:
+    from server import PromptServer
+    from aiohttp import web
+
+    # Only the plugin's fal upload and the read-only routes are cross-origin. Upload,
+    # delta and auto-queue write into the pod and are only called by the sync agent
+    # and curl, so browsers on other origins must not reach them.
+    CORS_HEADERS = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+        "Access-Control-Allow-Headers": "Content-Type",
+    }
+
+    @PromptServer.instance.routes.options("/photoshop_bridge/fal_upload")
+    async def fal_upload_preflight(request):
+        return web.Response(headers=CORS_HEADERS)
+
+    @PromptServer.instance.routes.post("/photoshop_bridge/fal_upload")
+    async def fal_upload(request):
+        """Upload a file from the input folder to fal.ai storage; returns its URL."""
+        data = await request.json()
+        filename = data.get("filename", "").strip()
+        fal_key = data.get("fal_key", "").strip()
+        if not filename or not fal_key:
+            return web.json_response({"error": "Missing filename or fal_key"}, status=400, headers=CORS_HEADERS)
+
+        input_dir = os.path.realpath(folder_paths.get_input_directory())
+        file_path = os.path.realpath(os.path.join(input_dir, filename))
+        if not file_path.startswith(input_dir + os.sep) or not os.path.isfile(file_path):
+            return web.json_response({"error": f"File not found: {filename}"}, status=404, headers=CORS_HEADERS)
+
+        print(f"[PhotoshopBridge] Uploading {filename} to fal.ai...")
+        loop = asyncio.get_running_loop()
+        try:
+            url = await loop.run_in_executor(None, fal.upload_file, file_path, fal_key)
+        except Exception as e:
+            print(f"[PhotoshopBridge] Fal upload failed: {e}")
+            return web.json_response({"error": str(e)}, status=500, headers=CORS_HEADERS)
+        print(f"[PhotoshopBridge] Fal upload success: {url}")
+        return web.json_response({"url": url}, headers=CORS_HEADERS)
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/upload/{name}")
+    async def upload_status(request):
+        path = _bridge_path(request.match_info["name"], subdir=request.query.get("subdir", ""))
+        if path is None:
+            return web.json_response({"error": "Invalid file name"}, status=400)
+        return web.json_response({"offset": _partial_size(path)})
+
+    @PromptServer.instance.routes.put("/photoshop_bridge/upload/{name}")
+    @PromptServer.instance.routes.post("/photoshop_bridge/upload/{name}")
+    async def upload(request):
+        """Stream the body into a dot-prefixed .part file, then rename it into place.
+
+        Query: offset (resume position, must equal the bytes already received),
+        total (final size; the upload stays open until it is reached, defaults to
+        completing with this request), decode=1 (warm the tensor cache),
+        subdir=store (an object or the manifest of the export store).
+        """
+        path = _bridge_path(request.match_info["name"], subdir=request.query.get("subdir", ""))
+        if path is None:
+            return web.json_response({"error": "Invalid file name"}, status=400)
+
+        try:
+            offset = int(request.query.get("offset", 0))
+            total = int(request.query["total"]) if "total" in request.query else None
+        except ValueError:
+            return web.json_response({"error": "offset and total must be integers"}, status=400)
+        received = _partial_size(path)
+        if offset != received and offset != 0:
+            return web.json_response({"error": "Offset mismatch", "offset": received}, status=409)
+
+        loop = asyncio.get_running_loop()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        f = await loop.run_in_executor(None, open, _partial_path(path), "r+b" if offset else "wb")
+        try:
+            f.seek(offset)
+            f.truncate()
+            async for chunk in request.content.iter_chunked(CHUNK_SIZE):
+                await loop.run_in_executor(None, f.write, chunk)
+            size = f.tell()
+        finally:
+            await loop.run_in_executor(None, f.close)
+
+        if total is not None and size < total:
+            return web.json_response({"offset": size, "complete": False})
+
+        await loop.run_in_executor(None, _finish, path)
+        if request.query.get("decode") in ("1", "true") and path.lower().endswith(IMAGE_EXTENSIONS):
+            _warm(path)
+        print(f"[PhotoshopBridge] Received {os.path.basename(path)} ({size} bytes)")
+        return web.json_response({"offset": size, "complete": True})
+
+    @PromptServer.instance.routes.put("/photoshop_bridge/delta/{name}")
+    async def apply_delta(request):
+        """Patch a bridge PNG with a .psdelta body; 409 if the base version differs."""
+        path = _bridge_path(request.match_info["name"], ('.png',))
+        if path is None:
+            return web.json_response({"error": "Invalid file name"}, status=400)
+        payload = await request.read()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, get_receiver().apply, os.path.basename(path), payload)
+        except DeltaMismatch as e:
+            return web.json_response({"error": str(e)}, status=409)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"applied": True})
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/autoqueue")
+    async def autoqueue_status(request):
+        queue = autoqueue.get_autoqueue()
+        if queue is None:
+            return web.json_response({"enabled": False})
+        return web.json_response({"enabled": True, "pinned": queue.pinned() is not None,
+                                  "delay": queue.delay})
+
+    @PromptServer.instance.routes.put("/photoshop_bridge/autoqueue")
+    async def autoqueue_pin(request):
+        """Pin an API-format workflow ({"prompt": {...}} or the bare node dict)."""
+        queue = autoqueue.get_autoqueue()
+        if queue is None:
+            return web.json_response({"error": "Set PS_BRIDGE_AUTOQUEUE to enable auto-queue"}, status=404)
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({"error": "Body must be JSON"}, status=400)
+        prompt = data.get("prompt", data) if isinstance(data, dict) else None
+        if not isinstance(prompt, dict):
+            return web.json_response({"error": "Expected an API-format workflow"}, status=400)
+        try:
+            queue.pin(prompt)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response({"pinned": True})
+
+    @PromptServer.instance.routes.delete("/photoshop_bridge/autoqueue")
+    async def autoqueue_unpin(request):
+        queue = autoqueue.get_autoqueue()
+        if queue is not None:
+            queue.unpin()
+        return web.json_response({"pinned": False})
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/files")
+    async def list_files(request):
+        """One page of what Load from Photoshop lists, newest first.
+
+        Query: offset, limit (default 100, at most 1000), q (glob on the name),
+        size (thumbnail size used in the returned thumb URLs).
+        """
+        try:
+            offset = max(0, int(request.query.get("offset", 0)))
+            limit = min(1000, max(1, int(request.query.get("limit", 100))))
+        except ValueError:
+            return web.json_response({"error": "offset and limit must be integers"},
+                                     status=400, headers=CORS_HEADERS)
+        entries = await asyncio.get_running_loop().run_in_executor(None, _listing)
+        pattern = request.query.get("q", "").strip().lower()
+        if pattern:
+            entries = [e for e in entries if fnmatch.fnmatch(e[0].lower(), pattern)]
+        px = _thumb_px(request.query.get("size"))
+        files = [{
+            "name": name,
+            "mtime": mtime_ns / 1e9,
+            "size": size,
+            "thumb": f"/photoshop_bridge/thumb?name={quote(name)}&size={px}&v={v}",
+        } for name, mtime_ns, size, v in entries[offset:offset + limit]]
+        return web.json_response({"total": len(entries), "offset": offset, "files": files},
+                                 headers=CORS_HEADERS)
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/thumb")
+    async def thumb(request):
+        """WebP thumbnail of a listed file.
+
+        Query: name, size (longest side, snapped to 64/128/256/512), version
+        (for "@name"), v (the version token from /files: mtime_ns, or the
+        content hash for "@name"; makes the response immutable). Otherwise the browser revalidates with the ETag.
+        """
+        try:
+            version = int(request.query.get("version", 0))
+        except ValueError:
+            version = 0
+        name = request.query.get("name", "")
+        px = _thumb_px(request.query.get("size"))
+        loop = asyncio.get_running_loop()
+        found = await loop.run_in_executor(None, _thumb_source, name, version)
+        if found is None:
+            return web.json_response({"error": "No such file"}, status=404, headers=CORS_HEADERS)
+        path, mtime_ns, size, v = found
+        key = thumbs.thumb_key(path, mtime_ns, size, px)
+        headers = dict(CORS_HEADERS, ETag=f'"{key}"')
+        headers["Cache-Control"] = ("private, max-age=31536000, immutable"
+                                    if request.query.get("v") == v else "no-cache")
+        if request.headers.get("If-None-Match") == headers["ETag"]:
+            return web.Response(status=304, headers=headers)
+        try:
+            thumb_path = await asyncio.wrap_future(thumbs.get_thumbs().get(key, path, px))
+            body = await loop.run_in_executor(None, _read, thumb_path)
+        except Exception as e:
+            return web.json_response({"error": f"Could not render a thumbnail: {e}"},
+                                     status=415, headers=CORS_HEADERS)
+        headers["Content-Type"] = "image/webp"
+        return web.Response(body=body, headers=headers)
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/traces")
+    async def traces(request):
+        """Per-stage export latency percentiles over the most recent traces.
+
+        Query: limit (number of exports, default all that are kept).
+        """
+        try:
+            limit = int(request.query.get("limit", 0))
+        except ValueError:
+            limit = 0
+        report = await asyncio.get_running_loop().run_in_executor(
+            None, get_trace_log(LoadFromPhotoshop.bridge_dir()).report, limit)
+        return web.json_response(report, headers=CORS_HEADERS)
+
+    @PromptServer.instance.routes.get("/photoshop_bridge/metrics")
+    async def metrics_route(request):
+        """Stage timings and cache counters in Prometheus text format."""
+        return web.Response(body=metrics.render().encode(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+except Exception as e:
+    print(f"[PhotoshopBridge] Could not register API route: {e}")
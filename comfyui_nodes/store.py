@@ -0,0 +1,160 @@
+"""
+Pod side of the content-addressed export store (bridge_sync/store.py).
+
+The loaders list store entries as "@<name>" and resolve them through the
+manifest to an immutable object, so the tensor cache key and IS_CHANGED are
+the content itself rather than a reused file name.
+"""
+
+import os
+import time
+import threading
+
+from ..bridge_sync.store import MANIFEST, STORE_DIR, Manifest
+
+PREFIX = "@"
+
+# Unreferenced objects younger than this may belong to a manifest still on its way.
+ORPHAN_GRACE = 600.0
+
+
+class ExportStore:
+    """The manifest of a store folder, re-read only when its signature moves.
+
+    Versions whose object is missing (evicted by retention) are marked on
+    load, whatever the sender's copy of the manifest says.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._manifest = Manifest()
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _manifest_signature(self):
+        try:
+            st = os.stat(os.path.join(self.directory, MANIFEST))
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def manifest(self):
+        signature = self._manifest_signature()
+        with self._lock:
+            if signature != self._signature:
+                self._manifest = Manifest.load(os.path.join(self.directory, MANIFEST)) \
+                    if signature else Manifest()
+                self._manifest.evict({file for file in self._manifest.objects()
+                                      if not os.path.exists(os.path.join(self.directory, file))})
+                self._signature = signature
+            return self._manifest
+
+    # ── Retention ────────────────────────────────────────────────────────────
+    def retention_entries(self):
+        """{object file: (size, last_used)} of objects only older versions use.
+
+        last_used is the newest version stored in the object; objects of
+        latest versions are left out, so they are never evicted.
+        """
+        manifest = self.manifest()
+        keep = manifest.latest_objects()
+        entries = {}
+        for versions in manifest.names.values():
+            for v in versions:
+                file = v["file"]
+                if file in keep or v.get("evicted"):
+                    continue
+                try:
+                    size = os.path.getsize(os.path.join(self.directory, file))
+                except OSError:
+                    continue
+                entries[file] = (size, max(v["time"], entries.get(file, (0, 0))[1]))
+        return entries
+
+    def evict(self, files):
+        """Delete objects and mark their versions evicted in manifest.json.
+
+        The manifest is only rewritten if no new one arrived meanwhile; the
+        marks are re-derived from missing objects on the next load anyway.
+        """
+        for file in files:
+            try:
+                os.remove(os.path.join(self.directory, file))
+            except OSError:
+                pass
+        manifest = self.manifest()
+        with self._lock:
+            manifest.evict(set(files))
+            signature = self._manifest_signature()
+            if signature is not None and signature == self._signature:
+                manifest.save(os.path.join(self.directory, MANIFEST))
+                self._signature = self._manifest_signature()
+
+    @property
+    def version(self):
+        """Moves whenever manifest.json is re-read or rewritten."""
+        self.manifest()
+        return self._signature
+
+    def prune_orphans(self, grace=ORPHAN_GRACE):
+        """Delete objects no manifest entry references; returns their names."""
+        referenced = self.manifest().objects()
+        cutoff = time.time() - grace
+        removed = []
+        try:
+            with os.scandir(self.directory) as it:
+                for de in it:
+                    if de.name.startswith(".") or de.name == MANIFEST or de.name in referenced:
+                        continue
+                    try:
+                        if de.is_file() and de.stat().st_ctime < cutoff:
+                            os.remove(de.path)
+                            removed.append(de.name)
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return removed
+
+    def entries(self, extensions):
+        """[("@name", mtime_ns, size)] of the latest stored versions, most recent first."""
+        latest = [(PREFIX + name, int(versions[-1]["time"] * 1e9), versions[-1]["size"])
+                  for name, versions in self.manifest().names.items()
+                  if versions and name.lower().endswith(extensions)]
+        latest.sort(key=lambda entry: entry[1], reverse=True)
+        return latest
+
+    def names(self, extensions):
+        """Combo entries for stored exports, most recently updated first."""
+        return [name for name, _, _ in self.entries(extensions)]
+
+    def resolve(self, image, version=0):
+        """(path, version number, entry) for "@name" at `version` (0 = latest), or None.
+
+        None also when that version's object was evicted.
+        """
+        found = self.manifest().resolve(image[len(PREFIX):], version)
+        if found is None:
+            return None
+        number, entry = found
+        return os.path.join(self.directory, entry["file"]), number, entry
+
+    def sidecar_path(self, image, version):
+        """Object holding the region sidecar that goes with this image version."""
+        name = image[len(PREFIX):]
+        entry = self.manifest().companion(name, version, os.path.splitext(name)[0] + ".json")
+        return os.path.join(self.directory, entry["file"]) if entry else None
+
+
+def is_stored(image):
+    return image.startswith(PREFIX)
+
+
+_store = None
+
+
+def get_store(bridge_dir):
+    global _store
+    if _store is None:
+        _store = ExportStore(os.path.join(bridge_dir, STORE_DIR))
+    return _store
@@ -0,0 +1,131 @@
+"""
+WebP thumbnails of bridge files for the file picker.
+
+Thumbnails are rendered on their own small worker pool, so browsing never
+queues behind loader decodes, and kept in a size-bounded folder keyed by
+(name, mtime_ns, size, px). A re-export gets a new key and the old one ages
+out; the key doubles as the ETag.
+"""
+
+import os
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from . import metrics
+from .decode import decode_preview
+
+THUMB_CACHE_MB = int(os.environ.get("PS_BRIDGE_THUMB_CACHE_MB", "256"))
+THUMB_WORKERS = int(os.environ.get("PS_BRIDGE_THUMB_WORKERS", "2"))
+
+SIZES = (64, 128, 256, 512)
+DEFAULT_SIZE = 256
+QUALITY = 80
+
+
+def thumb_key(name, mtime_ns, size, px):
+    return hashlib.sha256(f"{name}\0{mtime_ns}\0{size}\0{px}".encode()).hexdigest()[:32]
+
+
+class ThumbCache:
+    """<key>.webp files, evicted least recently used once over `max_bytes`."""
+
+    def __init__(self, directory, max_bytes, workers=THUMB_WORKERS):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._sizes = {}        # key -> bytes, least recently used first
+        self._pending = {}      # key -> Future of a render in progress
+        self._lock = threading.Lock()
+        self._pool = None
+        self._loaded = False
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".webp")
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as it:
+            for de in it:
+                if de.name.endswith(".webp"):
+                    st = de.stat()
+                    found.append((st.st_mtime, de.name[:-5], st.st_size))
+        for _, key, size in sorted(found):
+            self._sizes[key] = size
+
+    def get(self, key, source, px):
+        """Future of the thumbnail path for `key`, rendering `source` if it is not cached.
+
+        Concurrent requests for the same key share one render.
+        """
+        with self._lock:
+            self._load()
+            if key in self._sizes:
+                self._sizes[key] = self._sizes.pop(key)
+                metrics.count("thumb_hits")
+                future = Future()
+                future.set_result(self.path(key))
+                return future
+            future = self._pending.get(key)
+            if future is None:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=max(1, self.workers),
+                                                    thread_name_prefix="ps_bridge_thumb")
+                future = self._pool.submit(self._render, key, source, px)
+                self._pending[key] = future
+            return future
+
+    def _render(self, key, source, px):
+        path = self.path(key)
+        tmp = os.path.join(self.directory, f".{key}.part")
+        try:
+            with metrics.stage("thumb"):
+                decode_preview(source, px).save(tmp, "WEBP", quality=QUALITY, method=4)
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+        with self._lock:
+            self._sizes[key] = size
+            self._evict(keep=key)
+        metrics.count("thumb_renders")
+        return path
+
+    def _evict(self, keep):
+        total = sum(self._sizes.values())
+        for key in list(self._sizes):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+            total -= self._sizes.pop(key)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._sizes), "bytes": sum(self._sizes.values())}
+
+
+_thumbs = None
+
+
+def get_thumbs():
+    global _thumbs
+    if _thumbs is None:
+        import folder_paths
+        directory = os.path.join(folder_paths.get_input_directory(), ".photoshop_bridge_thumbs")
+        _thumbs = ThumbCache(directory, THUMB_CACHE_MB * 1024 * 1024)
+        metrics.add_collector(lambda: {f"thumb_cache_{k}": v for k, v in _thumbs.stats().items()})
+    return _thumbs
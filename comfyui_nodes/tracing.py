@@ -0,0 +1,101 @@
+"""
+Pod side of the export latency traces (bridge_sync/tracing.py).
+
+With PS_BRIDGE_TRACE=1, the first time Load from Photoshop loads an
+export whose trace sidecar has arrived, the trace gets arrive/load/ready
+stamps and is appended to `.traces.jsonl`. That load may be a tensor-cache
+hit when the upload route, the watcher or a delta already decoded the file.
+Later loads of the same export ID are not counted again, and once a file
+version is traced its later loads cost one stat.
+"""
+
+import os
+import json
+import threading
+from collections import deque
+
+from ..bridge_sync.tracing import LOG, SUFFIX, summarize
+
+ENABLED = os.environ.get("PS_BRIDGE_TRACE", "").strip().lower() in ("1", "true", "yes")
+KEEP = 1000
+
+
+class TraceLog:
+    """The most recent completed traces, in memory and as JSON lines on disk."""
+
+    def __init__(self, directory, keep=KEEP):
+        self.directory = directory
+        self.path = os.path.join(directory, LOG)
+        self._recent = deque(maxlen=keep)
+        self._ids = set()       # IDs of the traces in _recent
+        self._done = {}         # name -> (mtime_ns, size) of the export already traced
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        for line in lines:
+            try:
+                self._recent.append(json.loads(line))
+            except ValueError:
+                continue
+        self._ids = {trace.get("id") for trace in self._recent}
+        if len(lines) > 2 * self._recent.maxlen:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                f.writelines(json.dumps(trace) + "\n" for trace in self._recent)
+            os.replace(tmp, self.path)
+
+    def record(self, name, image_path, started, finished):
+        """Complete and store the trace for `name` if one arrived and is not counted yet."""
+        try:
+            st = os.stat(image_path)
+            signature = (st.st_mtime_ns, st.st_size)
+            if self._done.get(name) == signature:
+                return None
+            with open(os.path.join(self.directory, name + SUFFIX)) as f:
+                trace = json.load(f)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._load()
+            if not isinstance(trace, dict) or trace.get("id") in self._ids:
+                self._done[name] = signature
+                return None
+            self._done[name] = signature
+            trace.setdefault("stages", {}).update(arrive=st.st_ctime, load=started, ready=finished)
+            trace["name"] = name
+            if len(self._recent) == self._recent.maxlen:
+                self._ids.discard(self._recent[0].get("id"))
+            self._recent.append(trace)
+            self._ids.add(trace.get("id"))
+            with open(self.path, "a") as f:
+                f.write(json.dumps(trace) + "\n")
+        return trace
+
+    def report(self, limit=None):
+        with self._lock:
+            self._load()
+            traces = list(self._recent)
+        if limit:
+            traces = traces[-limit:]
+        report = summarize(traces)
+        report["recent"] = traces[-20:]
+        return report
+
+
+_trace_log = None
+
+
+def get_trace_log(directory):
+    global _trace_log
+    if _trace_log is None:
+        _trace_log = TraceLog(directory)
+    return _trace_log
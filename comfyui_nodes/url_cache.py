@@ -0,0 +1,157 @@
+"""
+Size-bounded on-disk cache for images loaded by URL.
+
+Bodies are streamed to disk once and revalidated with ETag/Last-Modified, so
+an unchanged object costs a single 304. Decoding goes through a memory map of
+the cached body and the decoded tensors live in the shared tensor cache.
+"""
+
+import os
+import json
+import mmap
+import time
+import hashlib
+import tempfile
+import threading
+import contextlib
+
+from PIL import Image
+
+from .decode import pil_to_tensors
+from .fal import session
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UrlCache:
+    """Cached URL bodies as <key>.bin plus <key>.json validators, evicted LRU by size."""
+
+    def __init__(self, directory, max_bytes, fresh_seconds=5.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._meta = {}         # key -> metadata dict
+        self._checked = {}      # key -> monotonic time of last revalidation
+        self._readers = {}      # key -> open reading() blocks; never evicted while > 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode()).hexdigest()[:32]
+
+    def body_path(self, key):
+        return os.path.join(self.directory, key + ".bin")
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            key = name[:-5]
+            if os.path.exists(self.body_path(key)):
+                self._meta[key] = meta
+
+    def _save_meta(self, key, meta):
+        path = os.path.join(self.directory, key + ".json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(path + ".tmp", path)
+
+    def fetch(self, url, timeout=60):
+        """Path and metadata of the current body for `url`, downloading only if it changed."""
+        key = self._key(url)
+        with self._lock:
+            self._load()
+            meta = self._meta.get(key)
+            if meta is not None and time.monotonic() - self._checked.get(key, -1e9) < self.fresh_seconds:
+                meta["last_used"] = time.time()
+                self._save_meta(key, meta)
+                return self.body_path(key), meta
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with session().get(url, headers=headers, stream=True, timeout=timeout) as resp:
+            if resp.status_code == 304 and meta is not None:
+                meta["last_used"] = time.time()
+            else:
+                resp.raise_for_status()
+                if resp.status_code != 200:
+                    raise RuntimeError(f"Unexpected {resp.status_code} for {url}")
+                # A temp file per download: concurrent fetches of one URL must not interleave.
+                fd, tmp = tempfile.mkstemp(prefix=f".{key}.", suffix=".part", dir=self.directory)
+                size = 0
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        for chunk in resp.iter_content(CHUNK_SIZE):
+                            f.write(chunk)
+                            size += len(chunk)
+                    os.replace(tmp, self.body_path(key))
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+                meta = {
+                    "url": url,
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "size": size,
+                    "last_used": time.time(),
+                }
+
+        with self._lock:
+            self._meta[key] = meta
+            self._checked[key] = time.monotonic()
+            self._save_meta(key, meta)
+            self._evict(keep=key)
+        return self.body_path(key), meta
+
+    @contextlib.contextmanager
+    def reading(self, url, timeout=60):
+        """fetch() whose body is not evicted until the block exits."""
+        key = self._key(url)
+        with self._lock:
+            self._readers[key] = self._readers.get(key, 0) + 1
+        try:
+            yield self.fetch(url, timeout)
+        finally:
+            with self._lock:
+                self._readers[key] -= 1
+                if not self._readers[key]:
+                    del self._readers[key]
+
+    def _evict(self, keep):
+        total = sum(m.get("size", 0) for m in self._meta.values())
+        for key, meta in sorted(self._meta.items(), key=lambda kv: kv[1].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep or key in self._readers:
+                continue
+            for path in (self.body_path(key), os.path.join(self.directory, key + ".json")):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= meta.get("size", 0)
+            del self._meta[key]
+            self._checked.pop(key, None)
+
+
+def decode_mapped(path):
+    """Decode straight from a read-only memory map of the file."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with Image.open(mm) as img:
+            img.load()
+            return pil_to_tensors(img)
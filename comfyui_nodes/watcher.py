@@ -0,0 +1,173 @@
+"""
+Background watcher for new files in the bridge folder.
+
+Uses inotify on Linux and falls back to stat polling elsewhere. Each completed
+arrival is debounced, then handed to the registered listeners; the default
+listener refreshes the directory index and pre-decodes the file into the
+tensor cache, at the size and crop loaders last used for it, so the next
+queued run skips decoding.
+"""
+
+import os
+import select
+import struct
+import threading
+import time
+
+from .nodes import IMAGE_EXTENSIONS, LoadFromPhotoshop, decode_pool, warm_cache
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _inotify_fd(path):
+    """inotify descriptor watching `path`, or None when unsupported."""
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def is_partial(name):
+    """rsync temp files (.name.XXXXXX, .~tmp~/) and upload .part files."""
+    return name.startswith(".") or ".~tmp~" in name
+
+
+class ArrivalWatcher(threading.Thread):
+    """Calls each listener with (name, path) once a file stops changing."""
+
+    def __init__(self, path, extensions, debounce=0.75, poll_interval=2.0):
+        super().__init__(name="ps_bridge_watcher", daemon=True)
+        self.path = path
+        self.extensions = tuple(extensions)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.listeners = []
+        self._pending = {}      # name -> deadline
+        self._delivered = {}    # name -> (mtime_ns, size)
+        self._seen = {}         # last polled (mtime_ns, size) per name
+        self._stopped = threading.Event()
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._delivered = self._scan()
+        self._seen = dict(self._delivered)
+        fd = _inotify_fd(self.path)
+        mode = "inotify" if fd is not None else "polling"
+        print(f"[PhotoshopBridge] Watching {self.path} ({mode})")
+        try:
+            while not self._stopped.is_set():
+                if fd is not None:
+                    self._wait_inotify(fd)
+                else:
+                    self._wait_poll()
+                self._flush()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _wanted(self, name):
+        return not is_partial(name) and name.lower().endswith(self.extensions)
+
+    def _touch(self, name):
+        if self._wanted(name):
+            self._pending[name] = time.monotonic() + self.debounce
+
+    def _wait_inotify(self, fd):
+        timeout = self.poll_interval
+        if self._pending:
+            timeout = max(0.0, min(self._pending.values()) - time.monotonic())
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            return
+        data = os.read(fd, 64 * 1024)
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b"\0").decode("utf-8", "replace")
+            pos += length
+            self._touch(name)
+
+    def _wait_poll(self):
+        self._stopped.wait(self.poll_interval)
+        found = self._scan()
+        for name, signature in found.items():
+            if self._seen.get(name) != signature:
+                self._touch(name)
+        self._seen = found
+
+    def _scan(self):
+        found = {}
+        try:
+            with os.scandir(self.path) as it:
+                for de in it:
+                    if self._wanted(de.name):
+                        try:
+                            st = de.stat()
+                        except OSError:
+                            continue
+                        found[de.name] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+        return found
+
+    def _flush(self):
+        now = time.monotonic()
+        for name, deadline in list(self._pending.items()):
+            if deadline > now:
+                continue
+            del self._pending[name]
+            path = os.path.join(self.path, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            signature = (st.st_mtime_ns, st.st_size)
+            if self._delivered.get(name) == signature:
+                continue
+            self._delivered[name] = signature
+            for listener in self.listeners:
+                try:
+                    listener(name, path)
+                except Exception as e:
+                    print(f"[PhotoshopBridge] Arrival listener failed for {name}: {e}")
+
+
+def prewarm(name, path):
+    LoadFromPhotoshop.index().invalidate()
+    decode_pool().submit(warm_cache, path)
+
+
+_watcher = None
+
+
+def get_watcher():
+    """The running watcher, started on first use."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ArrivalWatcher(LoadFromPhotoshop.bridge_dir(), IMAGE_EXTENSIONS)
+        _watcher.start()
+    return _watcher
+
+
+def start_if_enabled():
+    if os.environ.get("PS_BRIDGE_WATCH", "").strip().lower() in ("1", "true", "yes"):
+        get_watcher().add_listener(prewarm)
@@ -22,11 +22,12 @@ cat > "$PLIST_PATH" << EOF
     <array>
         <string>/bin/bash</string>
         <string>$SCRIPT_DIR/sync-to-pod.sh</string>
+        <string>--daemon</string>
     </array>
-    <key>WatchPaths</key>
-    <array>
-        <string>$EXPORTS_DIR</string>
-    </array>
+    <key>RunAtLoad</key>
+    <true/>
+    <key>KeepAlive</key>
+    <true/>
     <key>StandardOutPath</key>
     <string>/tmp/comfyui-sync.log</string>
     <key>StandardErrorPath</key>
@@ -37,5 +38,5 @@ EOF
 
 launchctl load "$PLIST_PATH"
 echo "Sync agent installed."
-echo "It will auto-run rsync whenever files change in exports/"
+echo "It stays running and syncs files as they change in exports/"
 echo "Logs: /tmp/comfyui-sync.log"
@@ -3,6 +3,9 @@ const { storage } = require("uxp");
 const { localFileSystem, formats } = storage;
 
 const SETTINGS_FILE = "bridge_settings.json";
+const LAYER_STACK = ".ps_layers.layers";
+const LAYER_INDEX = "layers.json";
+const TRACE_SUFFIX = ".trace.json";
 let outputFolder = null;
 
 // ── Init ─────────────────────────────────────────────────────────────────────
@@ -57,6 +60,112 @@ async function setOutputFolder() {
     }
 }
 
+// ── Selection ────────────────────────────────────────────────────────────────
+// Selection bounds in pixels, or null when nothing is selected.
+async function getSelectionBounds(docId) {
+    const result = await app.batchPlay(
+        [{ _obj: "get", _target: [{ _property: "selection" }, { _ref: "document", _id: docId }] }],
+        {}
+    );
+    const sel = result[0] && result[0].selection;
+    if (!sel) return null;
+    const px = (v) => Math.round(typeof v === "object" ? v._value : v);
+    const bounds = { left: px(sel.left), top: px(sel.top), right: px(sel.right), bottom: px(sel.bottom) };
+    if (bounds.right <= bounds.left || bounds.bottom <= bounds.top) return null;
+    return bounds;
+}
+
+async function writeSidecar(name, data) {
+    const file = await outputFolder.createFile(name, { overwrite: true });
+    await file.write(JSON.stringify(data), { format: formats.utf8 });
+}
+
+// ── Tracing ──────────────────────────────────────────────────────────────────
+// <export>.trace.json carries an export ID and wall-clock stage times; the
+// sync agent (--trace) and the pod loader add theirs (bridge_sync/tracing.py).
+function startTrace(filename) {
+    const id = Date.now().toString(36) + Math.random().toString(36).slice(2, 8);
+    return { id, file: filename, stages: { click: Date.now() / 1000 } };
+}
+
+function stamp(trace, stage) {
+    trace.stages[stage] = Date.now() / 1000;
+}
+
+// ── Layered export ───────────────────────────────────────────────────────────
+// Each selected layer is saved at its own bounds into a hidden stack folder,
+// with layers.json written last; the sync agent packs the folder into one
+// multi-page ps_layers.tif. No duplicate of the whole document is made.
+async function getStackFolder() {
+    try {
+        return await outputFolder.getEntry(LAYER_STACK);
+    } catch (e) {
+        return await outputFolder.createFolder(LAYER_STACK);
+    }
+}
+
+async function exportLayers(doc) {
+    const layers = doc.activeLayers.slice();
+    if (layers.length === 0) throw new Error("Select one or more layers.");
+
+    const stack = await getStackFolder();
+    // Drop the old index first so a half-written stack is never packed
+    try {
+        await (await stack.getEntry(LAYER_INDEX)).delete();
+    } catch (e) {
+        // No previous export
+    }
+
+    const originalDocId = doc.id;
+    const canvasWidth = Math.round(doc.width);
+    const canvasHeight = Math.round(doc.height);
+    const entries = [];
+
+    await core.executeAsModal(async () => {
+        for (let i = 0; i < layers.length; i++) {
+            const layer = layers[i];
+            const b = layer.bounds;
+            const left = Math.max(0, Math.floor(b.left));
+            const top = Math.max(0, Math.floor(b.top));
+            const right = Math.min(canvasWidth, Math.ceil(b.right));
+            const bottom = Math.min(canvasHeight, Math.ceil(b.bottom));
+            if (right <= left || bottom <= top) continue;   // empty or off-canvas
+
+            // A transparent document just the size of the layer
+            const layerDoc = await app.documents.add({
+                width: right - left,
+                height: bottom - top,
+                resolution: doc.resolution,
+                mode: constants.NewDocumentMode.RGB,
+                fill: constants.DocumentFill.TRANSPARENT,
+            });
+            const copy = await layer.duplicate(layerDoc);
+            copy.visible = true;
+            await copy.translate(-left, -top);
+
+            const filename = i + ".png";
+            const file = await stack.createFile(filename, { overwrite: true });
+            await layerDoc.saveAs.png(file, { compression: 6, interlaced: false }, true);
+            await layerDoc.close(constants.SaveOptions.DONOTSAVECHANGES);
+            entries.push({ file: filename, name: layer.name, left, top });
+        }
+
+        await app.batchPlay(
+            [{ _obj: "select", _target: [{ _ref: "document", _id: originalDocId }] }],
+            {}
+        );
+    }, { commandName: "Export Layers for ComfyUI" });
+
+    if (entries.length === 0) throw new Error("The selected layers are empty.");
+    const index = await stack.createFile(LAYER_INDEX, { overwrite: true });
+    await index.write(JSON.stringify({
+        canvas_width: canvasWidth,
+        canvas_height: canvasHeight,
+        layers: entries,
+    }), { format: formats.utf8 });
+    return entries.length;
+}
+
 // ── Export ────────────────────────────────────────────────────────────────────
 async function exportImage() {
     const doc = app.activeDocument;
@@ -70,18 +179,37 @@ async function exportImage() {
     }
 
     const exportType = document.querySelector("input[name='export-type']:checked").value;
+    const selectionOnly = document.getElementById("selection-only").checked;
     const btn = document.getElementById("export-btn");
     btn.disabled = true;
 
     try {
-        const filename = exportType === "layer" ? "ps_layer.png" : "ps_document.png";
+        if (exportType === "layers") {
+            showStatus("info", "Exporting layers...");
+            const count = await exportLayers(doc);
+            showStatus("success", "Exported " + count + " layer(s) to ps_layers.tif");
+            return;
+        }
+
+        const baseName = (exportType === "layer" ? "ps_layer" : "ps_document") + (selectionOnly ? "_region" : "");
+        const filename = baseName + ".png";
+        const trace = startTrace(filename);
         const file = await outputFolder.createFile(filename, { overwrite: true });
 
         showStatus("info", "Exporting...");
 
         const originalDocId = doc.id;
+        const canvasWidth = Math.round(doc.width);
+        const canvasHeight = Math.round(doc.height);
+        let region = null;
 
         await core.executeAsModal(async () => {
+            // Export only the selection bounds; the sidecar records where they sit
+            if (selectionOnly) {
+                region = await getSelectionBounds(originalDocId);
+                if (!region) throw new Error("Make a selection first.");
+            }
+
             const targetLayerName =
                 exportType === "layer" && app.activeDocument.activeLayers.length > 0
                     ? app.activeDocument.activeLayers[0].name
@@ -120,9 +248,15 @@ async function exportImage() {
                 }
             }
 
+            // Crop before flattening so only the region is composited
+            if (region) await dupDoc.crop(region);
+            stamp(trace, "duplicate");
+
             // Flatten and save
             await app.batchPlay([{ _obj: "flattenImage" }], {});
+            stamp(trace, "flatten");
             await dupDoc.saveAs.png(file, { compression: 6, interlaced: false }, true);
+            stamp(trace, "save");
             await dupDoc.close(constants.SaveOptions.DONOTSAVECHANGES);
 
             // Return focus to original document
@@ -132,6 +266,18 @@ async function exportImage() {
             );
         }, { commandName: "Export for ComfyUI" });
 
+        if (region) {
+            await writeSidecar(baseName + ".json", {
+                canvas_width: canvasWidth,
+                canvas_height: canvasHeight,
+                left: region.left,
+                top: region.top,
+                width: region.right - region.left,
+                height: region.bottom - region.top,
+            });
+        }
+        await writeSidecar(filename + TRACE_SUFFIX, trace);
+
         showStatus("success", "Exported " + filename);
     } catch (e) {
         showStatus("error", e.message);
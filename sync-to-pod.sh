@@ -12,6 +12,23 @@ SSH_CMD="ssh -p $POD_PORT -i $SSH_KEY -o ConnectTimeout=5 -o StrictHostKeyChecki
 
 mkdir -p "$LOCAL_DIR"
 
+# Resident agent (started by install-sync.sh): debounced, one reused SSH connection
+if [ "$1" = "--daemon" ]; then
+    cd "$SCRIPT_DIR" || exit 1
+    # Several pods: list them in pods.ini (see pods.example.ini)
+    # (results are only pulled back over SSH, so --pull needs an ssh target)
+    if [ -f "$SCRIPT_DIR/pods.ini" ]; then
+        if grep -Eq '^[[:space:]]*ssh[[:space:]]*=' "$SCRIPT_DIR/pods.ini"; then
+            exec /usr/bin/env python3 -m bridge_sync --exports "$LOCAL_DIR" \
+                --targets "$SCRIPT_DIR/pods.ini" --pull "$SCRIPT_DIR/imports"
+        fi
+        exec /usr/bin/env python3 -m bridge_sync --exports "$LOCAL_DIR" \
+            --targets "$SCRIPT_DIR/pods.ini"
+    fi
+    exec /usr/bin/env python3 -m bridge_sync --exports "$LOCAL_DIR" \
+        --ssh "$POD_IP" --port "$POD_PORT" --key "$SSH_KEY" --pull "$SCRIPT_DIR/imports"
+fi
+
 # Cleanup images older than 30 days
 find "$LOCAL_DIR" -type f \( -name "*.png" -o -name "*.jpg" -o -name "*.jpeg" -o -name "*.webp" \) -mtime +30 -delete 2>/dev/null
 
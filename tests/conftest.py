@@ -0,0 +1,54 @@
+"""
+Import the repo as a package (its modules use relative imports) with a
+stand-in `folder_paths` pointing at a temporary ComfyUI tree. Tests that
+need the node side skip when torch is not installed.
+"""
+
+import os
+import sys
+import types
+import importlib
+import tempfile
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = "photoshop_bridge"
+COMFY_DIR = tempfile.mkdtemp(prefix="ps_bridge_tests_")
+
+
+def _install_folder_paths():
+    module = types.ModuleType("folder_paths")
+    module.get_input_directory = lambda: os.path.join(COMFY_DIR, "input")
+    module.get_output_directory = lambda: os.path.join(COMFY_DIR, "output")
+    module.get_temp_directory = lambda: os.path.join(COMFY_DIR, "temp")
+    sys.modules.setdefault("folder_paths", module)
+
+
+def _install_package():
+    """Register the repo as PACKAGE without running its __init__ (which needs torch).
+
+    pytest itself imports the repo's __init__.py under the folder's name,
+    since the folder is a package, so that name gets the same stand-in.
+    """
+    if PACKAGE not in sys.modules:
+        package = types.ModuleType(PACKAGE)
+        package.__path__ = [REPO_DIR]
+        package.__file__ = os.path.join(REPO_DIR, "__init__.py")
+        sys.modules[PACKAGE] = package
+        sys.modules.setdefault(os.path.basename(REPO_DIR), package)
+
+
+_install_folder_paths()
+_install_package()
+
+
+def bridge_module(name):
+    """photoshop_bridge.<name>, e.g. "bridge_sync.agent"."""
+    return importlib.import_module(f"{PACKAGE}.{name}")
+
+
+@pytest.fixture
+def nodes():
+    pytest.importorskip("torch")
+    return bridge_module("comfyui_nodes.nodes")
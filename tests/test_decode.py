@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import bridge_module
+
+pytest.importorskip("torch")
+decode = bridge_module("comfyui_nodes.decode")
+rawpix = bridge_module("bridge_sync.rawpix")
+
+
+def _write_raw(tmp_path, pixels):
+    path = str(tmp_path / "a.psraw")
+    rawpix.write(pixels, path)
+    return path
+
+
+def test_decode_raw_16bit_downscaled_stays_in_range(tmp_path):
+    pixels = np.full((200, 300, 4), 50000, np.uint16)
+    pixels[..., 3] = 65535
+    image, mask = decode.decode_raw(_write_raw(tmp_path, pixels), max_pixels=10000)
+
+    image, mask = np.asarray(image), np.asarray(mask)
+    assert image.shape[1] * image.shape[2] <= 10000
+    assert image.max() <= 1.0
+    np.testing.assert_allclose(image, 50000 / 65535, atol=1e-3)
+    np.testing.assert_allclose(mask, 1.0, atol=1e-3)
+
+
+@pytest.mark.parametrize("dtype, scale", [(np.uint8, 255), (np.uint16, 65535)])
+def test_decode_raw_full_size(tmp_path, dtype, scale):
+    pixels = np.arange(6 * 4 * 3, dtype=dtype).reshape(6, 4, 3)
+    image, mask = decode.decode_raw(_write_raw(tmp_path, pixels))
+
+    image, mask = np.asarray(image), np.asarray(mask)
+    assert image.shape == (1, 6, 4, 3)
+    np.testing.assert_allclose(image[0], pixels / scale, atol=1e-6)
+    assert not mask.any()
+
+
+@pytest.mark.parametrize("dtype, value", [(np.uint8, 200), (np.uint16, 50000)])
+def test_decode_raw_resampled_keeps_value(tmp_path, dtype, value):
+    pixels = np.full((90, 120, 4), value, dtype)
+    pixels[..., 3] = np.iinfo(dtype).max
+    image, mask = decode.decode_raw(_write_raw(tmp_path, pixels), max_pixels=3000, multiple=8)
+
+    image, mask = np.asarray(image), np.asarray(mask)
+    height, width = image.shape[1:3]
+    assert height % 8 == 0 and width % 8 == 0 and height * width <= 3000
+    np.testing.assert_allclose(image, value / np.iinfo(dtype).max, atol=1e-3)
+    np.testing.assert_allclose(mask, 1.0, atol=1e-3)
+
+
+def test_missing_page_does_not_leak_the_file(tmp_path):
+    from PIL import Image
+    path = str(tmp_path / "one_page.tif")
+    Image.new("RGB", (8, 8)).save(path)
+
+    with pytest.raises(EOFError) as excinfo:     # held, as ComfyUI holds a node's error
+        decode.decode_file(path, page=3)
+    fds = "/proc/self/fd"
+    if os.path.isdir(fds):
+        open_paths = [os.path.realpath(os.path.join(fds, fd)) for fd in os.listdir(fds)]
+        assert os.path.realpath(path) not in open_paths
+    assert excinfo.traceback
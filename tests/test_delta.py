@@ -0,0 +1,147 @@
+import os
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import bridge_module
+
+delta = bridge_module("bridge_sync.delta")
+hashing = bridge_module("bridge_sync.hashing")
+transports = bridge_module("bridge_sync.transports")
+
+
+@pytest.fixture
+def delta_receiver(nodes):
+    return bridge_module("comfyui_nodes.delta_receiver")
+
+
+def _export(path, color):
+    pixels = np.zeros((64, 96, 3), np.uint8)
+    pixels[:] = color
+    Image.fromarray(pixels).save(path)
+    return pixels
+
+
+def _wait_written(receiver, name, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while name in receiver._writing:
+        assert time.monotonic() < deadline, "patched PNG was never written"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def bridge(tmp_path):
+    directory = tmp_path / "bridge"
+    directory.mkdir()
+    return str(directory)
+
+
+def _delta(path, pixels, changed):
+    encoder = delta.TileDeltaEncoder(tile=32)
+    base_id = hashing.hash_file(path)
+    encoder.acknowledge("a.png", encoder.prepare("a.png", path, base_id)[1])
+    new = pixels.copy()
+    new[:32, :32] = changed
+    Image.fromarray(new).save(path + ".new.png")
+    payload, _ = encoder.prepare("a.png", path + ".new.png", "ab" * 16)
+    os.remove(path + ".new.png")
+    return payload, new
+
+
+def test_local_dir_transport_applies_deltas(bridge):
+    path = os.path.join(bridge, "a.png")
+    pixels = _export(path, (10, 20, 30))
+    payload, new = _delta(path, pixels, (200, 0, 0))
+    transport = transports.LocalDirTransport(bridge, deltas=True)
+
+    assert transport.send_delta("a.png", payload)
+    assert not transport.send_delta("a.png", payload)      # base has moved on
+    transport.close()
+    with Image.open(path) as img:
+        np.testing.assert_array_equal(np.asarray(img.convert("RGB")), new)
+
+
+def test_apply_patches_a_copy_and_rewrites_the_file(bridge, nodes, delta_receiver):
+    path = os.path.join(bridge, "a.png")
+    pixels = _export(path, (10, 20, 30))
+    held_image, held_mask = nodes.load_cached(path)     # as an earlier prompt would hold it
+    before = np.array(held_image)
+
+    payload, new = _delta(path, pixels, (200, 0, 0))
+    receiver = delta_receiver.DeltaReceiver(bridge)
+    receiver.apply("a.png", payload)
+    _wait_written(receiver, "a.png")
+
+    np.testing.assert_array_equal(np.asarray(held_image), before)
+    with Image.open(path) as img:
+        np.testing.assert_array_equal(np.asarray(img.convert("RGB")), new)
+    image, _ = nodes.load_cached(path)
+    assert image is not held_image
+    np.testing.assert_allclose(np.asarray(image)[0, 0, 0], (200 / 255, 0, 0), atol=1e-6)
+
+
+def test_apply_rejects_an_unknown_base(bridge, delta_receiver):
+    path = os.path.join(bridge, "a.png")
+    pixels = _export(path, (10, 20, 30))
+    payload, _ = _delta(path, pixels, (200, 0, 0))
+    _export(path, (11, 20, 30))     # the pod's copy moved on
+
+    with pytest.raises(delta.DeltaMismatch):
+        delta_receiver.DeltaReceiver(bridge).apply("a.png", payload)
+
+
+class HeldPool:
+    """Runs nothing until told to, so a test can land an upload before the write."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+    def run(self):
+        for fn, args in self.jobs:
+            fn(*args)
+
+
+def test_full_upload_wins_over_a_pending_delta_write(bridge, nodes, delta_receiver, monkeypatch):
+    pool = HeldPool()
+    monkeypatch.setattr(delta_receiver, "decode_pool", lambda: pool)
+    path = os.path.join(bridge, "a.png")
+    pixels = _export(path, (10, 20, 30))
+    payload, _ = _delta(path, pixels, (200, 0, 0))
+    receiver = delta_receiver.DeltaReceiver(bridge)
+    receiver.apply("a.png", payload)
+
+    partial = os.path.join(bridge, ".a.png.part")
+    uploaded = _export(partial + ".png", (0, 90, 0))
+    os.rename(partial + ".png", partial)
+    receiver.replace_with_upload("a.png", partial)
+    pool.run()
+
+    with Image.open(path) as img:
+        np.testing.assert_array_equal(np.asarray(img.convert("RGB")), uploaded)
+    image, _ = nodes.load_cached(path)
+    np.testing.assert_allclose(np.asarray(image)[0, 0, 0], (0, 90 / 255, 0), atol=1e-6)
+    assert sorted(os.listdir(bridge)) == ["a.png"]
+
+
+def test_pending_delta_is_dropped_when_the_file_changes_on_disk(bridge, delta_receiver, monkeypatch):
+    pool = HeldPool()
+    monkeypatch.setattr(delta_receiver, "decode_pool", lambda: pool)
+    path = os.path.join(bridge, "a.png")
+    pixels = _export(path, (10, 20, 30))
+    payload, _ = _delta(path, pixels, (200, 0, 0))
+    receiver = delta_receiver.DeltaReceiver(bridge)
+    receiver.apply("a.png", payload)
+
+    time.sleep(0.01)
+    synced = _export(path, (1, 2, 3))      # e.g. rsync replaced it meanwhile
+    pool.run()
+
+    with Image.open(path) as img:
+        np.testing.assert_array_equal(np.asarray(img.convert("RGB")), synced)
+    assert "a.png" not in receiver._writing
+    assert sorted(os.listdir(bridge)) == ["a.png"]
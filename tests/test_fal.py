@@ -0,0 +1,51 @@
+from conftest import bridge_module
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.text = ""
+        self.closed = False
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.bodies = []
+
+    def post(self, url, headers, data, timeout):
+        self.bodies.append(data.read())
+        return self.responses.pop(0)
+
+
+def test_retries_release_the_slot_and_the_failed_response(nodes, monkeypatch):
+    fal = bridge_module("comfyui_nodes.fal")
+    torch = __import__("torch")
+    failed = FakeResponse(503)
+    fake = FakeSession([failed, FakeResponse(200, {"url": "https://cdn/x.png"})])
+    monkeypatch.setattr(fal, "session", lambda: fake)
+
+    def sleep(seconds):
+        assert failed.closed, "failed response still open during backoff"
+        assert fal._slots.acquire(blocking=False), "slot held during backoff"
+        fal._slots.release()
+    monkeypatch.setattr(fal.time, "sleep", sleep)
+    for _ in range(fal.MAX_CONCURRENT - 1):
+        fal._slots.acquire()
+    try:
+        url = fal.upload_image(torch.zeros((1, 4, 4, 3)), "key")
+    finally:
+        for _ in range(fal.MAX_CONCURRENT - 1):
+            fal._slots.release()
+
+    assert url == "https://cdn/x.png"
+    assert len(fake.bodies) == 2 and fake.bodies[0] == fake.bodies[1]
+    assert fake.bodies[0].startswith(b"\x89PNG")
@@ -0,0 +1,47 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from conftest import bridge_module
+
+layered = bridge_module("bridge_sync.layered")
+
+
+def _stack(exports, colors):
+    stack = os.path.join(exports, ".ps_layers.layers")
+    os.makedirs(stack, exist_ok=True)
+    entries = []
+    for i, color in enumerate(colors):
+        Image.new("RGBA", (16, 8), color).save(os.path.join(stack, f"{i}.png"))
+        entries.append({"file": f"{i}.png", "name": f"Layer {i}", "left": 4 * i, "top": 2 * i})
+    with open(os.path.join(stack, layered.INDEX), "w") as f:
+        json.dump({"canvas_width": 64, "canvas_height": 32, "layers": entries}, f)
+    return stack
+
+
+def test_pack_and_read_pages(tmp_path):
+    stack = _stack(str(tmp_path), [(255, 0, 0, 255), (0, 255, 0, 128)])
+    path = layered.pack_stale(stack)
+
+    assert path == os.path.join(str(tmp_path), "ps_layers.tif")
+    assert layered.pack_stale(stack) is None        # unchanged stack
+    canvas, pages = layered.read_pages(path)
+    assert canvas == (64, 32)
+    assert [(p["name"], p["left"], p["top"], p["width"]) for p in pages] == [
+        ("Layer 0", 0, 0, 16), ("Layer 1", 4, 2, 16)]
+
+
+def test_pixel_fingerprint_covers_every_page(tmp_path):
+    pytest.importorskip("torch")
+    fingerprint = bridge_module("comfyui_nodes.fingerprint")
+    stack = _stack(str(tmp_path), [(255, 0, 0, 255), (0, 255, 0, 128)])
+    path = layered.container_path(stack)
+    layered.pack(stack, path)
+    first = fingerprint.hash_pixels(path)
+
+    _stack(str(tmp_path), [(255, 0, 0, 255), (0, 0, 255, 128)])     # only layer 2 changed
+    layered.pack(stack, path)
+    assert fingerprint.hash_pixels(path) != first
@@ -0,0 +1,54 @@
+import os
+import sys
+import types
+
+import pytest
+from PIL import Image
+
+from conftest import bridge_module
+
+pytest.importorskip("torch")
+retention = bridge_module("comfyui_nodes.retention")
+store_module = bridge_module("comfyui_nodes.store")
+Manifest = bridge_module("bridge_sync.store").Manifest
+
+
+def _queue(monkeypatch, prompt):
+    queue = types.SimpleNamespace(get_current_queue=lambda: ([], [(0, "id", prompt, {}, [])]))
+    server = types.ModuleType("server")
+    server.PromptServer = types.SimpleNamespace(instance=types.SimpleNamespace(prompt_queue=queue))
+    monkeypatch.setitem(sys.modules, "server", server)
+
+
+def test_queued_references_expand_batch_selections(nodes, monkeypatch):
+    bridge_dir = nodes.LoadFromPhotoshop.bridge_dir()
+    os.makedirs(bridge_dir, exist_ok=True)
+    for name in ("shot_a.png", "shot_b.png", "other.png"):
+        Image.new("RGB", (4, 4)).save(os.path.join(bridge_dir, name))
+    nodes.LoadFromPhotoshop.index().invalidate()
+    _queue(monkeypatch, {"1": {"class_type": "LoadBatchFromPhotoshop", "inputs": {
+        "selection": "glob", "pattern": "shot_*", "count": 8, "size_policy": "pad"}}})
+
+    refs = retention.queued_references()
+    assert {"shot_a.png", "shot_b.png"} <= refs
+    assert "other.png" not in refs
+
+
+def test_queued_references_resolve_stored_versions(tmp_path, monkeypatch):
+    manifest = Manifest()
+    manifest.add("a.png", "h1", "h1.png", 1, 1.0)
+    manifest.add("a.png", "h2", "h2.png", 1, 2.0)
+    manifest.save(str(tmp_path / "manifest.json"))
+    for name in ("h1.png", "h2.png"):
+        (tmp_path / name).write_bytes(b"x")
+    store = store_module.ExportStore(str(tmp_path))
+
+    _queue(monkeypatch, {"1": {"class_type": "LoadFromPhotoshop",
+                               "inputs": {"image": "@a.png", "version": 1}}})
+    assert os.path.join("store", "h1.png") in retention.queued_references(store)
+    assert os.path.join("store", "h2.png") not in retention.queued_references(store)
+
+    _queue(monkeypatch, {"1": {"class_type": "LoadFromPhotoshop",
+                               "inputs": {"image": "@a.png", "version": ["2", 0]}}})
+    assert {os.path.join("store", "h1.png"), os.path.join("store", "h2.png")} \
+        <= retention.queued_references(store)
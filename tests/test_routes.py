@@ -0,0 +1,42 @@
+import os
+import time
+
+from conftest import bridge_module
+
+
+def test_upload_decode_failures_are_logged(nodes, tmp_path, capsys):
+    routes = bridge_module("comfyui_nodes.routes")
+    path = str(tmp_path / "broken.png")
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n truncated")
+
+    routes._warm(path)
+    deadline = time.monotonic() + 10
+    while "Could not decode broken.png" not in capsys.readouterr().out:
+        assert time.monotonic() < deadline, "decode failure was not logged"
+        time.sleep(0.01)
+
+
+def test_stored_thumbs_are_versioned_by_content_hash(nodes):
+    routes = bridge_module("comfyui_nodes.routes")
+    Manifest = bridge_module("bridge_sync.store").Manifest
+    store = nodes.LoadFromPhotoshop.store()
+    manifest_path = os.path.join(store.directory, "manifest.json")
+    os.makedirs(store.directory, exist_ok=True)
+    existed = os.path.exists(manifest_path)
+    manifest = Manifest.load(manifest_path) if existed else Manifest()
+    original = manifest.copy()
+    manifest.add("thumb_token.png", "c0ffee", "c0ffee.png", 6, time.time() - 3600)
+    with open(os.path.join(store.directory, "c0ffee.png"), "wb") as f:
+        f.write(b"pixels")
+    manifest.save(manifest_path)
+    try:
+        listed = {name: v for name, _, _, v in routes._listing()}
+        assert listed["@thumb_token.png"] == "c0ffee"
+        assert routes._thumb_source("@thumb_token.png")[3] == "c0ffee"
+    finally:
+        os.remove(os.path.join(store.directory, "c0ffee.png"))
+        if existed:
+            original.save(manifest_path)
+        else:
+            os.remove(manifest_path)
@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+
+
+def test_save_skips_only_an_identical_save(nodes, monkeypatch, tmp_path):
+    torch = nodes.torch
+    writes = []
+
+    def save_atomic(img, path, fmt, compression):
+        writes.append((os.path.basename(path), fmt, compression))
+        open(path, "wb").close()
+
+    monkeypatch.setattr(nodes, "save_atomic", save_atomic)
+    monkeypatch.setattr(nodes, "tensor_to_pil", lambda image, mask: None)
+    monkeypatch.setattr(nodes.SaveImageToPhotoshop, "outbox_dir", classmethod(lambda cls: str(tmp_path)))
+    images = torch.from_numpy(np.full((1, 4, 4, 3), 0.5, dtype=np.float32))
+    node = nodes.SaveImageToPhotoshop()
+
+    node.save_images(images, "same", "png", 1)
+    node.save_images(images, "same", "png", 1)
+    node.save_images(images, "same", "png", 9)
+    node.save_images(images, "same", "webp_lossless", 9)
+    assert writes == [("same_0000.png", "png", 1), ("same_0000.png", "png", 9),
+                      ("same_0000.webp", "webp_lossless", 9)]
+
+
+def test_composite_cycles_a_shorter_background_batch(nodes):
+    torch = nodes.torch
+    images = torch.from_numpy(np.ones((5, 2, 2, 3), dtype=np.float32))
+    background = torch.from_numpy(np.arange(2, dtype=np.float32)[:, None, None, None]
+                                  * np.ones((2, 4, 4, 3), dtype=np.float32))
+    out = np.asarray(nodes.SaveRegionToPhotoshop.composite(images, background, 2, 2))
+
+    assert out.shape == (5, 4, 4, 3)
+    assert [out[i, 0, 0, 0] for i in range(5)] == [0, 1, 0, 1, 0]
+    assert (out[:, 2:, 2:] == 1).all()
+    assert (np.asarray(background)[:, 2:, 2:] != 1).any()
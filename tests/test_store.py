@@ -0,0 +1,56 @@
+import os
+import time
+
+import pytest
+
+from conftest import bridge_module
+
+
+class StubIndex:
+    version = 1
+
+    def entries(self):
+        return []
+
+    def invalidate(self):
+        pass
+
+
+class StubCache:
+    def discard(self, path):
+        pass
+
+
+def _object(directory, name, data=b"pixels"):
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(data)
+
+
+def test_retention_evicts_old_versions_and_orphans(tmp_path):
+    pytest.importorskip("torch")
+    store_module = bridge_module("comfyui_nodes.store")
+    retention = bridge_module("comfyui_nodes.retention")
+    Manifest = bridge_module("bridge_sync.store").Manifest
+
+    store_dir = tmp_path / "store"
+    store_dir.mkdir()
+    old = time.time() - 10 * 86400
+    manifest = Manifest()
+    manifest.add("a.png", "h1", "h1.png", 6, old)
+    manifest.add("a.png", "h2", "h2.png", 6, old + 1)
+    manifest.save(str(store_dir / "manifest.json"))
+    for name in ("h1.png", "h2.png", "orphan.png"):
+        _object(str(store_dir), name)
+
+    pod = retention.PodRetention(str(tmp_path), StubIndex(), StubCache(), 1, 0)
+    pod.store = store_module.ExportStore(str(store_dir))
+    assert pod.sweep() == [os.path.join("store", "h1.png")]
+
+    assert not (store_dir / "h1.png").exists()
+    assert (store_dir / "h2.png").exists()
+    reloaded = store_module.ExportStore(str(store_dir))
+    assert reloaded.resolve("@a.png", 1) is None
+    assert reloaded.resolve("@a.png")[1] == 2
+
+    assert reloaded.prune_orphans(grace=-1) == ["orphan.png"]
+    assert sorted(os.listdir(store_dir)) == ["h2.png", "manifest.json"]
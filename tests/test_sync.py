@@ -0,0 +1,80 @@
+import os
+import configparser
+
+from conftest import bridge_module
+
+transports = bridge_module("bridge_sync.transports")
+fanout = bridge_module("bridge_sync.fanout")
+
+
+def _targets(**dirs):
+    cfg = configparser.ConfigParser()
+    cfg.read_dict({name: {"dir": str(path), "concurrency": "1"} for name, path in dirs.items()})
+    return [(name, cfg[name]) for name in dirs]
+
+
+def test_local_dir_round_trip(tmp_path):
+    source = tmp_path / "exports"
+    source.mkdir()
+    (source / "a.png").write_bytes(b"first")
+    (source / "b.json").write_bytes(b"{}")
+    pod = tmp_path / "pod"
+    transport = transports.LocalDirTransport(str(pod))
+
+    transport.send([str(source / "a.png"), str(source / "b.json")])
+    transport.send([str(source / "a.png")], "store")
+    (source / "a.png").write_bytes(b"second")
+    transport.send([str(source / "a.png")])
+
+    assert (pod / "a.png").read_bytes() == b"second"
+    assert (pod / "b.json").read_bytes() == b"{}"
+    assert (pod / "store" / "a.png").read_bytes() == b"first"
+    assert sorted(os.listdir(pod)) == ["a.png", "b.json", "store"]
+    assert not transport.can_pull
+
+
+def test_fan_out_keeps_going_past_a_failing_target(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "a.png").write_bytes(b"pixels")
+    good = tmp_path / "good"
+    broken = tmp_path / "broken"
+    broken.write_bytes(b"a file, not a folder")
+
+    sync = fanout.FanOutSync(str(exports), _targets(good=good, broken=broken),
+                             pull_dir=str(tmp_path / "imports"))
+    status = sync.once()
+
+    assert (good / "a.png").read_bytes() == b"pixels"
+    assert status["good"]["state"] == "idle"
+    assert status["broken"]["state"] == "retrying"
+    assert all(agent.pull_dir is None for agent in sync.agents.values())
+    assert all(agent.deltas is None for agent in sync.agents.values())     # no receiver there
+    assert os.path.exists(sync.status_path)
+
+
+def test_deltas_only_with_a_receiver(tmp_path):
+    agent_module = bridge_module("bridge_sync.agent")
+    exports = tmp_path / "exports"
+    exports.mkdir()
+
+    def agent(transport, name):
+        return agent_module.SyncAgent(str(exports), transport, state_path=str(tmp_path / name))
+
+    assert agent(transports.LocalDirTransport(str(tmp_path / "a")), "a.json").deltas is None
+    plain = transports.ParallelTransport([transports.LocalDirTransport(str(tmp_path / "b"))])
+    assert agent(plain, "b.json").deltas is None
+    if agent_module.TileDeltaEncoder is not None:
+        receiving = transports.LocalDirTransport(str(tmp_path / "c"), deltas=True)
+        assert agent(receiving, "c.json").deltas is not None
+
+
+def test_fan_out_takes_raw_defaults_from_the_command_line(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    targets = _targets(a=tmp_path / "a", b=tmp_path / "b")
+    targets[1][1]["raw"] = "no"
+
+    sync = fanout.FanOutSync(str(exports), targets, raw=True, raw_compress=True)
+    assert (sync.agents["a"].raw, sync.agents["a"].raw_compress) == (True, True)
+    assert sync.agents["b"].raw is False
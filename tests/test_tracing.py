@@ -0,0 +1,40 @@
+import os
+import json
+
+import pytest
+from PIL import Image
+
+from conftest import bridge_module
+
+pytest.importorskip("torch")
+tracing = bridge_module("comfyui_nodes.tracing")
+
+
+def test_trace_ids_are_bounded_with_the_recent_traces(tmp_path):
+    log = tracing.TraceLog(str(tmp_path), keep=2)
+    image = tmp_path / "a.png"
+    for i in range(3):
+        image.write_bytes(b"x" * (i + 1))       # each export is a new file version
+        (tmp_path / "a.png.trace.json").write_text(json.dumps({"id": f"e{i}", "stages": {}}))
+        assert log.record("a.png", str(image), 1.0, 2.0)["id"] == f"e{i}"
+    assert log._ids == {"e1", "e2"}
+    image.write_bytes(b"y")
+    assert log.record("a.png", str(image), 1.0, 2.0) is None
+
+
+def test_trace_completes_when_the_cache_is_already_warm(nodes, monkeypatch):
+    bridge_dir = nodes.LoadFromPhotoshop.bridge_dir()
+    tmp_log = tracing.TraceLog(bridge_dir)
+    monkeypatch.setattr(tracing, "ENABLED", True)
+    monkeypatch.setattr(tracing, "_trace_log", tmp_log)
+    path = os.path.join(bridge_dir, "traced.png")
+    Image.new("RGB", (8, 8)).save(path)
+    with open(path + ".trace.json", "w") as f:
+        json.dump({"id": "warm-1", "stages": {"click": 1.0}}, f)
+
+    nodes.load_cached(path)     # as the upload route, the watcher or a delta would
+    nodes.LoadFromPhotoshop().load_image("traced.png")
+    nodes.LoadFromPhotoshop().load_image("traced.png")
+
+    assert [trace["id"] for trace in tmp_log.report()["recent"]] == ["warm-1"]
+    assert set(tmp_log.report()["recent"][0]["stages"]) == {"click", "arrive", "load", "ready"}
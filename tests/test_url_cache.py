@@ -0,0 +1,106 @@
+import os
+import threading
+
+import pytest
+
+from conftest import bridge_module
+
+pytest.importorskip("torch")
+url_cache = bridge_module("comfyui_nodes.url_cache")
+
+BODY = [b"a" * 1000, b"b" * 1000, b"c" * 1000]
+
+
+class SlowResponse:
+    status_code = 200
+    headers = {"ETag": '"v1"'}
+
+    def __init__(self, barrier):
+        self.barrier = barrier
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for chunk in BODY:
+            self.barrier.wait()     # both downloads write each chunk in lockstep
+            yield chunk
+
+
+def test_concurrent_fetches_of_one_url_do_not_collide(tmp_path, monkeypatch):
+    barrier = threading.Barrier(2)
+    session = type("Session", (), {"get": lambda self, url, **kw: SlowResponse(barrier)})()
+    monkeypatch.setattr(url_cache, "session", lambda: session)
+    cache = url_cache.UrlCache(str(tmp_path), 1 << 20)
+    results, errors = [], []
+
+    def fetch():
+        try:
+            results.append(cache.fetch("https://example.com/a.png"))
+        except Exception as e:
+            errors.append(e)
+            barrier.abort()
+
+    threads = [threading.Thread(target=fetch) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    path = results[0][0]
+    with open(path, "rb") as f:
+        assert f.read() == b"".join(BODY)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".part")]
+
+
+class Response:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        yield self.body
+
+
+def _cache(tmp_path, monkeypatch, max_bytes):
+    session = type("Session", (), {"get": lambda self, url, **kw: Response(b"x" * 1000)})()
+    monkeypatch.setattr(url_cache, "session", lambda: session)
+    return url_cache.UrlCache(str(tmp_path), max_bytes, fresh_seconds=60)
+
+
+def test_fresh_hits_count_as_uses_for_eviction(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, monkeypatch, 2500)
+    a, _ = cache.fetch("https://example.com/a.png")
+    b, _ = cache.fetch("https://example.com/b.png")
+    cache.fetch("https://example.com/a.png")        # fresh hit
+    cache.fetch("https://example.com/c.png")
+
+    assert os.path.exists(a)
+    assert not os.path.exists(b)
+
+
+def test_bodies_being_read_are_not_evicted(tmp_path, monkeypatch):
+    cache = _cache(tmp_path, monkeypatch, 1500)
+    with cache.reading("https://example.com/a.png") as (a, _):
+        cache.fetch("https://example.com/b.png")
+        assert os.path.exists(a)
+    cache.fetch("https://example.com/c.png")
+    assert not os.path.exists(a)
@@ -0,0 +1,21 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+
+def test_prewarm_decodes_at_the_size_loaders_use(nodes):
+    bridge_dir = nodes.LoadFromPhotoshop.bridge_dir()
+    os.makedirs(bridge_dir, exist_ok=True)
+    path = os.path.join(bridge_dir, "warm.png")
+    Image.fromarray(np.zeros((400, 600, 3), np.uint8)).save(path)
+    image, _, _, _ = nodes.LoadFromPhotoshop().load_image("warm.png", max_megapixels=0.01, multiple_of=8)
+
+    Image.fromarray(np.full((400, 600, 3), 255, np.uint8)).save(path)     # the next export lands
+    warmed = nodes.warm_cache(path)
+    assert warmed[0].shape == image.shape
+    assert nodes.load_cached(path, None, 10000, 8) is warmed
+
+    other = os.path.join(bridge_dir, "new_name.png")
+    Image.fromarray(np.zeros((400, 600, 3), np.uint8)).save(other)
+    assert nodes.warm_cache(other)[0].shape == image.shape     # unseen names use the last sizing